@@ -0,0 +1,192 @@
+# Monte Carlo conclave simulation on the generated network. Electors are the
+# cardinals under 80; edge weights are their influence on each other. Every
+# trial repeats ballots until one candidate reaches two thirds of the votes.
+#
+# Ballot model, per trial and round:
+#   score[e, c] = affinity[e, c] + social * share of e's (weighted) neighbours
+#                 voting c last round + bandwagon * c's overall vote share
+#   vote[e]     = argmax_c(score[e, c] + temperature * Gumbel noise)
+# affinity is the edge weight between elector and candidate (scaled to
+# [0, 1]); electors never vote for themselves. Trials are simulated together
+# as (trials x electors x candidates) arrays, in seeded batches that can be
+# spread over a process pool: results depend on the seed and batch size only,
+# not on the number of workers.
+import argparse
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import networkx as nx
+import numpy as np
+import pandas as pd
+
+ELECTOR_AGE_LIMIT = 80
+
+# Electorate shared with pool workers, set once per worker process
+_worker_electorate = None
+
+class Electorate:
+    # Electors, candidates and the arrays a ballot needs
+    def __init__(self, G, communities=None, candidates=10, age_limit=ELECTOR_AGE_LIMIT, weight='weight'):
+        self.electors = [node for node, age in G.nodes(data='age') if age is not None and age < age_limit]
+        if len(self.electors) < 2:
+            raise ValueError("At least two electors are needed for a ballot")
+        influence = nx.to_numpy_array(G, nodelist=self.electors, weight=weight)
+        strength = influence.sum(axis=1)
+
+        # The strongest-connected electors stand as candidates
+        self.candidate_index = np.argsort(-strength, kind='stable')[:min(candidates, len(self.electors))]
+        self.candidates = [self.electors[i] for i in self.candidate_index]
+
+        self.affinity = influence[:, self.candidate_index] / max(influence.max(), 1e-12)
+        self.affinity[self.candidate_index, np.arange(len(self.candidate_index))] = -np.inf
+        self.influence = influence / np.maximum(strength, 1e-12)[:, None]
+
+        if communities is not None:
+            self.elector_community = np.array([communities[node] for node in self.electors])
+        else:
+            self.elector_community = np.zeros(len(self.electors), dtype=np.int64)
+        self.candidate_community = self.elector_community[self.candidate_index]
+
+    @property
+    def n_electors(self):
+        return len(self.electors)
+
+    @property
+    def votes_needed(self):
+        return math.ceil(2 * self.n_electors / 3)
+
+def simulate_batch(electorate, trials, rng, social=2.0, bandwagon=5.0, temperature=0.5, max_rounds=50):
+    # Columns: rounds, winner (candidate position or -1), winning votes and
+    # the share of those votes cast from the winner's own community
+    n_candidates = len(electorate.candidates)
+    rounds = np.full(trials, max_rounds, dtype=np.int64)
+    winner = np.full(trials, -1, dtype=np.int64)
+    winning_votes = np.zeros(trials, dtype=np.int64)
+    bloc_share = np.full(trials, np.nan)
+
+    active = np.arange(trials)
+    scores = np.broadcast_to(electorate.affinity, (trials,) + electorate.affinity.shape)
+    candidate_range = np.arange(n_candidates)
+    for ballot in range(1, max_rounds + 1):
+        noise = rng.gumbel(size=scores.shape) * temperature
+        votes = np.argmax(scores + noise, axis=2)
+        ballots = (votes[:, :, None] == candidate_range).astype(np.float64)
+        counts = ballots.sum(axis=1)
+
+        leader = counts.argmax(axis=1)
+        decided = counts[np.arange(len(active)), leader] >= electorate.votes_needed
+        if decided.any():
+            done = active[decided]
+            rounds[done] = ballot
+            winner[done] = leader[decided]
+            winning_votes[done] = counts[decided, leader[decided]]
+            voters = votes[decided] == leader[decided, None]
+            own = electorate.elector_community[None, :] == electorate.candidate_community[leader[decided]][:, None]
+            bloc_share[done] = (voters & own).sum(axis=1) / voters.sum(axis=1)
+
+        keep = ~decided
+        active = active[keep]
+        if len(active) == 0:
+            break
+        ballots = ballots[keep]
+        shares = counts[keep] / electorate.n_electors
+        # Neighbour shares for all trials in one (E x E) @ (E x trials*C) product
+        n_active, n_electors, _ = ballots.shape
+        neighbours = electorate.influence @ ballots.transpose(1, 0, 2).reshape(n_electors, -1)
+        neighbours = neighbours.reshape(n_electors, n_active, n_candidates).transpose(1, 0, 2)
+        scores = electorate.affinity + social * neighbours + bandwagon * shares[:, None, :]
+
+    return pd.DataFrame({
+        'rounds': rounds,
+        'decided': winner >= 0,
+        'winner': winner,
+        'winning_votes': winning_votes,
+        'bloc_share': bloc_share,
+    })
+
+def _init_worker(electorate):
+    global _worker_electorate
+    _worker_electorate = electorate
+
+def _run_batch(args):
+    trials, seed_sequence, params = args
+    return simulate_batch(_worker_electorate, trials, np.random.default_rng(seed_sequence), **params)
+
+def simulate(electorate, trials=10000, seed=42, batch_size=1000, workers=None, **params):
+    # One row per trial; batch i always uses the i-th child of SeedSequence(seed)
+    sizes = [min(batch_size, trials - start) for start in range(0, trials, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    tasks = [(size, child, params) for size, child in zip(sizes, seeds)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers <= 1:
+        batches = [simulate_batch(electorate, size, np.random.default_rng(child), **params)
+                   for size, child, params in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(electorate,)) as pool:
+            batches = list(pool.map(_run_batch, tasks))
+    results = pd.concat(batches, ignore_index=True)
+    decided = results['winner'] >= 0
+    results['winner_name'] = None
+    results.loc[decided, 'winner_name'] = np.array(electorate.candidates, dtype=object)[results.loc[decided, 'winner']]
+    results['winner_community'] = pd.array([pd.NA] * len(results), dtype='Int64')
+    results.loc[decided, 'winner_community'] = electorate.candidate_community[results.loc[decided, 'winner']]
+    return results
+
+def rounds_distribution(results):
+    # Number of trials decided in each round (undecided trials excluded)
+    decided = results[results['decided']]
+    return decided['rounds'].value_counts().sort_index().rename('trials')
+
+def community_summary(results):
+    # Per Louvain community of the winner: wins, win rate, rounds and bloc share
+    decided = results[results['decided']]
+    summary = decided.groupby('winner_community').agg(
+        wins=('winner', 'size'),
+        mean_rounds=('rounds', 'mean'),
+        mean_bloc_share=('bloc_share', 'mean'),
+    )
+    summary['win_rate'] = summary['wins'] / len(results)
+    return summary.sort_values('wins', ascending=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo conclave ballots on the cardinals network")
+    parser.add_argument("--nodes", default="nodes.csv")
+    parser.add_argument("--edges", default="edges.csv")
+    parser.add_argument("--trials", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=1000, help="trials simulated together per task")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--candidates", type=int, default=10, help="strongest-connected electors standing")
+    parser.add_argument("--social", type=float, default=2.0, help="weight of the neighbours' last votes")
+    parser.add_argument("--bandwagon", type=float, default=5.0, help="weight of the overall vote shares")
+    parser.add_argument("--temperature", type=float, default=0.5, help="scale of the per-ballot noise")
+    parser.add_argument("--max-rounds", type=int, default=50)
+    parser.add_argument("--output", default=None, help="optional CSV with one row per trial")
+    args = parser.parse_args(argv)
+
+    from graph_loader import load_graph
+    from community_detection import detect_communities
+    G = load_graph(args.nodes, args.edges)
+    communities, _ = detect_communities(G, seed=args.seed)
+    electorate = Electorate(G, communities, candidates=args.candidates)
+    results = simulate(electorate, trials=args.trials, seed=args.seed, batch_size=args.batch_size,
+                       workers=args.workers, social=args.social, bandwagon=args.bandwagon,
+                       temperature=args.temperature, max_rounds=args.max_rounds)
+
+    print(f"{electorate.n_electors} electors, {electorate.votes_needed} votes needed, "
+          f"{len(electorate.candidates)} candidates")
+    print(f"Decided: {results['decided'].mean():.1%} of {len(results)} trials "
+          f"within {args.max_rounds} rounds")
+    print("\nRounds to decision:")
+    print(rounds_distribution(results).to_string())
+    print("\nWinners by Louvain community:")
+    print(community_summary(results).to_string(float_format=lambda x: f"{x:.3f}"))
+    print("\nMost frequent winners:")
+    print(results['winner_name'].value_counts().head(10).to_string())
+    if args.output:
+        results.to_csv(args.output, index=False)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# Benchmark suite: times each step of the pipeline on synthetic rosters and
+# writes the results as JSON so runs can be compared for regressions.
+#
+#   python benchmarks/run_benchmarks.py --sizes 1000,10000,100000
+#   python benchmarks/run_benchmarks.py --baseline benchmarks/results/<earlier>.json
+#
+# Every stage runs in a fresh (spawned) process, so its peak RSS is its own;
+# stages hand data to each other through files in a per-size work directory,
+# exactly as the scripts do.
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from instrumentation import peak_rss_mb
+from synthetic_roster import write_roster
+
+STAGES = ['generate', 'load_csv', 'load_npy', 'metrics', 'spectral', 'louvain', 'layout', 'spring', 'render']
+
+# Largest roster each stage runs on by default. All-pairs distances are
+# O(n^2) memory, python-louvain and the layout are pure Python; spring is
+# the plain nx.spring_layout reference for the multilevel layout.
+DEFAULT_MAX_NODES = {
+    'metrics': 5000,
+    'louvain': 20000,
+    'layout': 20000,
+    'spring': 5000,
+    'render': 20000,
+}
+
+# Above this many cardinals generate uses the tiled sparse engine with a
+# per-node top-k cutoff; the dense engine keeps nearly all n^2/2 pairs
+DENSE_LIMIT = 2000
+
+def stage_generate(config):
+    from conclave_generate import generate_network
+    sparse = config['n'] > config['dense_limit']
+    generate_network(engine='sparse' if sparse else 'numpy',
+                     top_k=config['top_k'] if sparse else None,
+                     roster_file=config['roster'], output_format='both')
+    from edge_store import EDGE_DIR
+    sources = np.load(os.path.join(EDGE_DIR, 'source.npy'), mmap_mode='r')
+    return {'engine': 'sparse' if sparse else 'numpy', 'edges': len(sources)}
+
+def stage_load_csv(config):
+    from graph_loader import load_graph
+    G = load_graph('nodes.csv', 'edges.csv', use_cache=False)
+    return {'nodes': G.number_of_nodes(), 'edges': G.number_of_edges()}
+
+def stage_load_npy(config):
+    from edge_store import EDGE_DIR
+    from graph_loader import load_graph
+    G = load_graph('nodes.csv', EDGE_DIR, use_cache=False)
+    return {'nodes': G.number_of_nodes(), 'edges': G.number_of_edges()}
+
+def stage_metrics(config, G):
+    from graph_metrics import distance_metrics
+    from centrality import sampled_betweenness
+    from clustering import clustering_metrics
+    distances = distance_metrics(G)
+    clustering = clustering_metrics(G).average_clustering
+    k = min(config['betweenness_samples'], G.number_of_nodes())
+    sampled_betweenness(G, k=k, seed=0, workers=1)
+    return {'diameter': distances.diameter, 'average_clustering': clustering, 'betweenness_samples': k}
+
+def stage_spectral(config, G):
+    from spectral_analysis import spectral_analysis
+    spectral = spectral_analysis(G, seed=0)
+    frame = spectral.to_frame()
+    return {'spectral_radius': spectral.spectral_radius,
+            'spectral_clusters': int(frame['SpectralCluster'].nunique())}
+
+def stage_louvain(config, G):
+    from community_detection import detect_communities
+    partition, modularity = detect_communities(G, seed=0, use_cache=False)
+    return {'communities': len(set(partition.values())), 'modularity': modularity}
+
+def stage_layout(config, G):
+    # Uncached: layout_cache.get_layout would serve reruns from .conclave_cache
+    from layout_cache import multilevel_layout
+    multilevel_layout(G, seed=0)
+    return {}
+
+def stage_spring(config, G):
+    from layout_cache import spring_layout
+    spring_layout(G, seed=0)
+    return {}
+
+def stage_render(config, G):
+    from layout_cache import get_layout
+    from static_render import draw_network
+    pos = get_layout(G)
+    draw_network(G, pos, 'network_visualization.png', preview=True)
+    return {}
+
+STAGE_FUNCTIONS = {
+    'generate': stage_generate,
+    'load_csv': stage_load_csv,
+    'load_npy': stage_load_npy,
+    'metrics': stage_metrics,
+    'spectral': stage_spectral,
+    'louvain': stage_louvain,
+    'layout': stage_layout,
+    'spring': stage_spring,
+    'render': stage_render,
+}
+
+# Stages that get the (pickle-cached) graph loaded before the clock starts
+GRAPH_STAGES = {'metrics', 'spectral', 'louvain', 'layout', 'spring', 'render'}
+
+def run_stage(name, config):
+    # Child process entry point: {'seconds', 'peak_rss_mb', ...stage details}
+    import matplotlib
+    matplotlib.use('Agg')
+    os.chdir(config['workdir'])
+    args = ()
+    if name in GRAPH_STAGES:
+        from graph_loader import load_graph
+        args = (load_graph('nodes.csv', 'edges.csv'),)
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        details = STAGE_FUNCTIONS[name](config, *args)
+        seconds = time.perf_counter() - start
+    return dict(details, seconds=seconds, peak_rss_mb=peak_rss_mb())
+
+def run_size(n, stages, args):
+    workdir = os.path.join(args.work_dir, str(n))
+    os.makedirs(workdir, exist_ok=True)
+    roster = write_roster(n, os.path.join(workdir, 'roster.csv'), seed=args.seed)
+    config = {
+        'n': n,
+        'workdir': workdir,
+        'roster': roster,
+        'dense_limit': args.dense_limit,
+        'top_k': args.top_k,
+        'betweenness_samples': args.betweenness_samples,
+    }
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for name in stages:
+        limit = args.max_nodes.get(name)
+        if limit is not None and n > limit:
+            results[name] = {'status': 'skipped', 'reason': f'n > {limit}'}
+            print(f"  {name:<9} skipped (n > {limit})")
+            continue
+        if name != 'generate' and results.get('generate', {}).get('status') != 'ok':
+            results[name] = {'status': 'skipped', 'reason': 'no generated network'}
+            continue
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_stage, name, config).result()
+            result['status'] = 'ok'
+            print(f"  {name:<9} {result['seconds']:9.3f}s  {result['peak_rss_mb']:8.1f} MB")
+        except Exception as e:
+            result = {'status': 'error', 'error': f'{type(e).__name__}: {e}'}
+            print(f"  {name:<9} error: {result['error']}")
+        results[name] = result
+    if results.get('layout', {}).get('status') == 'ok' and results.get('spring', {}).get('status') == 'ok':
+        speedup = results['spring']['seconds'] / max(results['layout']['seconds'], 1e-9)
+        results['layout']['speedup_vs_spring'] = speedup
+        print(f"  layout    {speedup:.2f}x faster than spring")
+    return results
+
+def environment():
+    import pandas
+    import networkx
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'networkx': networkx.__version__,
+    }
+
+def compare(results, baseline, threshold):
+    # Print stages that got slower than baseline by more than threshold
+    regressions = []
+    for size, stages in results['sizes'].items():
+        for name, result in stages.items():
+            before = baseline.get('sizes', {}).get(size, {}).get(name, {})
+            if result.get('status') != 'ok' or before.get('status') != 'ok':
+                continue
+            ratio = result['seconds'] / max(before['seconds'], 1e-9)
+            marker = '  REGRESSION' if ratio > 1 + threshold else ''
+            if marker:
+                regressions.append((size, name, ratio))
+            print(f"  n={size:<7} {name:<9} {before['seconds']:9.3f}s -> {result['seconds']:9.3f}s "
+                  f"({ratio:.2f}x){marker}")
+    return regressions
+
+def parse_max_nodes(values):
+    limits = dict(DEFAULT_MAX_NODES)
+    for value in values:
+        stage, _, limit = value.partition('=')
+        if stage not in STAGES:
+            raise SystemExit(f"Unknown stage in --max-nodes: {stage}")
+        limits[stage] = int(limit) if limit and limit != 'none' else None
+    return limits
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the network pipeline on synthetic rosters")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated roster sizes")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {', '.join(STAGES)}")
+    parser.add_argument("--max-nodes", action="append", default=[], metavar="STAGE=N",
+                        help="skip STAGE above N cardinals ('none' removes the cap); "
+                             f"defaults: {DEFAULT_MAX_NODES}")
+    parser.add_argument("--dense-limit", type=int, default=DENSE_LIMIT,
+                        help="largest roster generated with the dense engine")
+    parser.add_argument("--top-k", type=int, default=20, help="sparse engine: strongest edges kept per node")
+    parser.add_argument("--betweenness-samples", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", default=os.path.join(BENCH_DIR, "work"))
+    parser.add_argument("--output", default=None,
+                        help="results JSON (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="slowdown ratio above which a stage is reported as a regression")
+    args = parser.parse_args(argv)
+    args.max_nodes = parse_max_nodes(args.max_nodes)
+    args.work_dir = os.path.abspath(args.work_dir)
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage: {', '.join(unknown)}")
+    if 'generate' not in stages:
+        # Every other stage reads the generated network
+        stages = ['generate'] + stages
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'config': {'dense_limit': args.dense_limit, 'top_k': args.top_k,
+                   'betweenness_samples': args.betweenness_samples, 'seed': args.seed,
+                   'max_nodes': args.max_nodes},
+        'sizes': {},
+    }
+    for n in sizes:
+        print(f"n = {n}")
+        results['sizes'][str(n)] = run_size(n, stages, args)
+
+    output = args.output or os.path.join(BENCH_DIR, 'results',
+                                         f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        print(f"Compared with {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            sys.exit(1)
+    return results
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Synthetic cardinal rosters of any size with the schema of data/cardinals.csv.
+# Columns are resampled from the real roster so the weighting rules see
+# realistic value distributions: Country and Order independently,
+# (Date_of_consistory, Pope_of_consistory) jointly, Age with a matching
+# Date_of_birth.
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+REAL_ROSTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data', 'cardinals.csv')
+
+# Reference date the real roster's ages were computed at
+REFERENCE_YEAR = 2025
+
+def synthetic_roster(n, seed=0, source=REAL_ROSTER):
+    rng = np.random.default_rng(seed)
+    real = pd.read_csv(source, encoding='utf-8')
+
+    def resample(columns):
+        return real[columns].iloc[rng.integers(0, len(real), n)].reset_index(drop=True)
+
+    consistory = resample(['Date_of_consistory', 'Pope_of_consistory'])
+    age = resample('Age').to_numpy()
+    birth_day = rng.integers(1, 29, n)
+    birth_month = pd.to_datetime(rng.integers(1, 13, n).astype(str), format='%m').strftime('%B')
+    birth_year = REFERENCE_YEAR - age - 1
+
+    return pd.DataFrame({
+        'No': np.arange(1, n + 1),
+        'Name': [f'Cardinal {i:06d}' for i in range(1, n + 1)],
+        'Country': resample('Country').to_numpy(),
+        'Order': resample('Order').to_numpy(),
+        'Office': [f'Synthetic office {i}' for i in range(1, n + 1)],
+        'Date_of_birth': [f'{d} {m} {y}' for d, m, y in zip(birth_day, birth_month, birth_year)],
+        'Age': age,
+        'Date_of_consistory': consistory['Date_of_consistory'].to_numpy(),
+        'Pope_of_consistory': consistory['Pope_of_consistory'].to_numpy(),
+    })
+
+def write_roster(n, path, seed=0, source=REAL_ROSTER):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    synthetic_roster(n, seed=seed, source=source).to_csv(path, index=False, encoding='utf-8')
+    return path
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write synthetic cardinal rosters")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma-separated row counts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output-dir", default="benchmarks/data")
+    args = parser.parse_args(argv)
+    for n in [int(size) for size in args.sizes.split(",") if size.strip()]:
+        path = write_roster(n, os.path.join(args.output_dir, f"cardinals_{n}.csv"), seed=args.seed)
+        print(f"{path}: {n} rows")
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,82 @@
 # Import necessary libraries
+import argparse
 import pandas as pd
-import networkx as nx
-import community as community_louvain
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from collections import defaultdict
+from graph_loader import load_graph
+from graph_metrics import distance_metrics
+from clustering import clustering_metrics
+from community_stats import community_stats
+from community_detection import detect_communities
+from layout_cache import get_layout
+from static_render import draw_network, plot_community_sizes, plot_stat_panels, plot_correlation_heatmap
+from render_queue import RenderJob, render
+from instrumentation import add_arguments, configure, count, span, traced
 
-def analyze_clusters():
+# Javított stílus minden ábrához
+STYLE = 'seaborn-v0_8'
+
+def cluster_stats(G, communities):
+    # Közösségi statisztikák (vektorizált, egyetlen menetben az éltömbökön)
+    return community_stats(G, communities)[[
+        'size', 'countries', 'continents', 'avg_age', 'cb_count', 'total_weight',
+        'internal_edges', 'external_edges', 'cb_ratio', 'internal_ratio',
+        'internal_weight', 'external_weight'
+    ]]
+
+def figure_jobs(G, communities, stats_df, preview=False, seed=42):
+    # A közösségi elemzés ábrái renderelési feladatként
+    community_sizes = pd.Series(communities.values()).value_counts()
+    pos = get_layout(G, seed=seed)
+    return [
+        # 1. Közösségek mérete
+        RenderJob('community_sizes.png', plot_community_sizes,
+                  community_sizes=community_sizes, style=STYLE),
+        # 2. Közösségek jellemzői
+        RenderJob('community_characteristics.png', plot_stat_panels,
+                  stats_df=stats_df, style=STYLE, panels=[
+                      ('avg_age', 'Átlagéletkor'),
+                      ('cb_ratio', 'CB kardinálisok aránya'),
+                      ('countries', 'Országok száma'),
+                      ('internal_ratio', 'Belső kapcsolatok aránya')
+                  ]),
+        # 3. Korrelációs mátrix
+        RenderJob('community_correlations.png', plot_correlation_heatmap,
+                  stats_df=stats_df, style=STYLE),
+        # 4. Hálózat vizualizáció közösségekkel: csomópontok közösségek szerint
+        # színezve, címkék csak a legerősebb csomópontokon
+        RenderJob('network_visualization.png', draw_network,
+                  G=G, pos=pos, node_color=[communities[node] for node in G.nodes()],
+                  title='Bíborosok hálózata közösségekkel', preview=preview, style=STYLE),
+    ]
+
+@traced('cluster_analysis')
+def analyze_clusters(preview=False, workers=None, force=False, seed=42):
     # Load the network data
-    edges_df = pd.read_csv('edges.csv')
-    nodes_df = pd.read_csv('nodes.csv')
-    
-    # Create NetworkX graph
-    G = nx.Graph()
-    
-    # Add nodes with attributes
-    for _, row in nodes_df.iterrows():
-        G.add_node(row['Id'], 
-                  country=row['Country'],
-                  continent=row['Continent'],
-                  order=row['Order'],
-                  age=row['Age'],
-                  weight=row['Weight'])
-    
-    # Add edges with weights
-    for _, row in edges_df.iterrows():
-        G.add_edge(row['Source'], row['Target'], weight=row['Weight'])
+    with span('cluster_analysis.load_graph'):
+        G = load_graph('nodes.csv', 'edges.csv')
+        count('nodes', G.number_of_nodes())
+        count('edges', G.number_of_edges())
     
     print("=== HÁLÓZATI ELEMZÉS ===")
     print("\n1. ALAPVETŐ JELLEMZŐK:")
     print(f"Csomópontok száma: {G.number_of_nodes()}")
     print(f"Élek száma: {G.number_of_edges()}")
     print(f"Átlagos fokszám: {sum(dict(G.degree()).values()) / G.number_of_nodes():.2f}")
-    print(f"Hálózat átmérője: {nx.diameter(G)}")
-    print(f"Átlagos legrövidebb út: {nx.average_shortest_path_length(G):.2f}")
-    print(f"Klaszterezettségi együttható: {nx.average_clustering(G):.2f}")
-    
-    # Közösségi detektálás Louvain módszerrel
-    communities = community_louvain.best_partition(G)
-    n_communities = len(set(communities.values()))
+    with span('cluster_analysis.distances'):
+        distances = distance_metrics(G)
+        print(f"Hálózat átmérője: {distances.diameter}")
+        print(f"Átlagos legrövidebb út: {distances.average_shortest_path_length:.2f}")
+    with span('cluster_analysis.clustering'):
+        print(f"Klaszterezettségi együttható: {clustering_metrics(G).average_clustering:.2f}")
+    
+    # Közösségi detektálás Louvain módszerrel (rögzített seed, gyorsítótárazva)
+    with span('cluster_analysis.communities'):
+        communities, modularity = detect_communities(G, seed=seed)
+        n_communities = len(set(communities.values()))
+        count('communities', n_communities)
     
     print("\n2. KÖZÖSSÉGEK ELEMZÉSE:")
     print(f"Detektált közösségek száma: {n_communities}")
+    print(f"Modularitás: {modularity:.3f}")
     
     # Közösségek méretének elemzése
     community_sizes = pd.Series(communities.values()).value_counts()
@@ -52,127 +84,15 @@ def analyze_clusters():
     for comm_id, size in community_sizes.items():
         print(f"Közösség {comm_id}: {size} tag")
     
-    # Közösségi statisztikák
-    community_stats = defaultdict(lambda: {
-        'size': 0,
-        'countries': set(),
-        'continents': set(),
-        'avg_age': 0,
-        'cb_count': 0,
-        'total_weight': 0,
-        'internal_edges': 0,
-        'external_edges': 0
-    })
-    
-    # Közösségek jellemzőinek számítása
-    for node in G.nodes():
-        comm_id = communities[node]
-        stats = community_stats[comm_id]
-        
-        # Alap statisztikák
-        stats['size'] += 1
-        stats['countries'].add(G.nodes[node]['country'])
-        stats['continents'].add(G.nodes[node]['continent'])
-        stats['avg_age'] += G.nodes[node]['age']
-        if G.nodes[node]['order'] == 'CB':
-            stats['cb_count'] += 1
-        stats['total_weight'] += G.nodes[node]['weight']
-        
-        # Élek elemzése
-        for neighbor in G.neighbors(node):
-            if communities[neighbor] == comm_id:
-                stats['internal_edges'] += 1
-            else:
-                stats['external_edges'] += 1
-    
-    # Átlagok számítása
-    for comm_id in community_stats:
-        stats = community_stats[comm_id]
-        stats['avg_age'] /= stats['size']
-        stats['countries'] = len(stats['countries'])
-        stats['continents'] = len(stats['continents'])
-        stats['cb_ratio'] = stats['cb_count'] / stats['size']
-        stats['internal_ratio'] = stats['internal_edges'] / (stats['internal_edges'] + stats['external_edges'])
-    
-    # Statisztikák DataFrame-be konvertálása
-    stats_df = pd.DataFrame.from_dict(community_stats, orient='index')
-    stats_df.index.name = 'Community'
+    with span('cluster_analysis.stats'):
+        stats_df = cluster_stats(G, communities)
     
     print("\n3. KÖZÖSSÉGEK JELLEMZŐI:")
     print(stats_df)
     
-    # Vizualizációk
-    plt.style.use('seaborn-v0_8')  # Javított stílus
-    
-    # 1. Közösségek mérete
-    plt.figure(figsize=(10, 6))
-    community_sizes.plot(kind='bar')
-    plt.title('Közösségek mérete')
-    plt.xlabel('Közösség ID')
-    plt.ylabel('Csomópontok száma')
-    plt.savefig('community_sizes.png')
-    plt.close()
-    
-    # 2. Közösségek jellemzői
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    
-    # Átlagéletkor
-    sns.barplot(x=stats_df.index, y='avg_age', data=stats_df, ax=axes[0,0])
-    axes[0,0].set_title('Átlagéletkor')
-    
-    # CB arány
-    sns.barplot(x=stats_df.index, y='cb_ratio', data=stats_df, ax=axes[0,1])
-    axes[0,1].set_title('CB kardinálisok aránya')
-    
-    # Országok száma
-    sns.barplot(x=stats_df.index, y='countries', data=stats_df, ax=axes[1,0])
-    axes[1,0].set_title('Országok száma')
-    
-    # Belső kapcsolatok aránya
-    sns.barplot(x=stats_df.index, y='internal_ratio', data=stats_df, ax=axes[1,1])
-    axes[1,1].set_title('Belső kapcsolatok aránya')
-    
-    plt.tight_layout()
-    plt.savefig('community_characteristics.png')
-    plt.close()
-    
-    # 3. Korrelációs mátrix
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(stats_df.corr(), annot=True, cmap='coolwarm', center=0)
-    plt.title('Közösségi jellemzők korrelációja')
-    plt.savefig('community_correlations.png')
-    plt.close()
-    
-    # 4. Hálózat vizualizáció közösségekkel
-    plt.figure(figsize=(15, 15))
-    
-    # Pozíciók számítása
-    pos = nx.spring_layout(G, k=1, iterations=50)
-    
-    # Csomópontok rajzolása közösségek szerint színezve
-    node_colors = [communities[node] for node in G.nodes()]
-    node_sizes = [G.nodes[node]['weight']/10 for node in G.nodes()]
-    
-    nx.draw_networkx_nodes(G, pos, 
-                          node_color=node_colors,
-                          node_size=node_sizes,
-                          alpha=0.8)
-    
-    # Élek rajzolása
-    edge_weights = [G[u][v]['weight'] for u, v in G.edges()]
-    nx.draw_networkx_edges(G, pos, 
-                          width=edge_weights,
-                          alpha=0.2)
-    
-    # Címkék rajzolása
-    nx.draw_networkx_labels(G, pos, 
-                           font_size=8,
-                           font_family='sans-serif')
-    
-    plt.title('Bíborosok hálózata közösségekkel')
-    plt.axis('off')
-    plt.savefig('network_visualization.png')
-    plt.close()
+    # Vizualizációk: egymástól független ábrák, párhuzamosan rajzolva
+    with span('cluster_analysis.render'):
+        render(figure_jobs(G, communities, stats_df, preview=preview, seed=seed), workers=workers, force=force)
     
     print("\nAz elemzés kész! A vizualizációk a következő fájlokban találhatók:")
     print("- community_sizes.png")
@@ -180,5 +100,17 @@ def analyze_clusters():
     print("- community_correlations.png")
     print("- network_visualization.png")
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='A bíborosi hálózat közösségi elemzése')
+    parser.add_argument('--preview', action='store_true', help='gyors, alacsony felbontású ábrák')
+    parser.add_argument('--workers', type=int, default=None, help='párhuzamos rajzoló folyamatok száma')
+    parser.add_argument('--force-render', action='store_true',
+                        help='változatlan bemenetű ábrák újrarajzolása is')
+    parser.add_argument('--seed', type=int, default=42)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    configure(args)
+    analyze_clusters(preview=args.preview, workers=args.workers, force=args.force_render, seed=args.seed)
+
 if __name__ == "__main__":
-    analyze_clusters() 
\ No newline at end of file
+    main() 
\ No newline at end of file
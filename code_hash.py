@@ -0,0 +1,46 @@
+# Which project modules a piece of code depends on, for cache keys: a module
+# plus every project module it imports, directly or transitively, with
+# function-level imports included
+import ast
+import functools
+import os
+from graph_loader import file_hash
+
+# Project modules live next to this file
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def imported_modules(tree):
+    # Top-level names of every import in tree, function-level imports included
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name.split('.')[0]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            yield node.module.split('.')[0]
+
+def local_modules(tree):
+    return {f'{name}.py' for name in imported_modules(tree)
+            if os.path.exists(os.path.join(PROJECT_DIR, f'{name}.py'))}
+
+@functools.lru_cache(maxsize=None)
+def module_closure(path):
+    # path (relative to PROJECT_DIR) plus every project module it imports
+    seen = {path}
+    pending = [path]
+    while pending:
+        with open(os.path.join(PROJECT_DIR, pending.pop()), encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+        for module in local_modules(tree) - seen:
+            seen.add(module)
+            pending.append(module)
+    return frozenset(seen)
+
+def project_path(path):
+    # path relative to PROJECT_DIR, or None outside the project
+    relative = os.path.relpath(os.path.abspath(path), PROJECT_DIR)
+    return None if relative.startswith(os.pardir) else relative
+
+def closure_hash(*paths):
+    # Content hash of the given project modules and everything they import
+    modules = sorted(set().union(*(module_closure(path) for path in paths)))
+    return file_hash(*(os.path.join(PROJECT_DIR, module) for module in modules))
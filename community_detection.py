@@ -0,0 +1,176 @@
+# Seeded, cached community detection: one Louvain/Leiden run per
+# (graph hash, method, resolution, seed), parallel resolution sweeps and a
+# stability score across seeds
+import argparse
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from graph_loader import CACHE_DIR, graph_hash
+
+# Partitions already computed in this process, keyed like the files on disk
+_memory_cache = {}
+
+# Graph shared with pool workers, set once per worker process
+_worker_graph = None
+
+def louvain_partition(G, resolution=1.0, seed=42, weight='weight'):
+    from community import community_louvain
+    partition = community_louvain.best_partition(G, weight=weight, resolution=resolution,
+                                                  random_state=seed)
+    return partition, community_louvain.modularity(partition, G, weight=weight)
+
+def leiden_partition(G, resolution=1.0, seed=42, weight='weight'):
+    # Optional: needs python-igraph and leidenalg
+    try:
+        import igraph as ig
+        import leidenalg
+    except ImportError as e:
+        raise ImportError("Leiden needs the optional packages python-igraph and leidenalg "
+                          "(pip install python-igraph leidenalg)") from e
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data=weight, default=1))
+    graph = ig.Graph(n=len(nodes), edges=[(index[u], index[v]) for u, v, _ in edges])
+    graph.es['weight'] = [w for _, _, w in edges]
+    result = leidenalg.find_partition(graph, leidenalg.RBConfigurationVertexPartition,
+                                      weights='weight', resolution_parameter=resolution, seed=seed)
+    partition = dict(zip(nodes, result.membership))
+    from community import community_louvain
+    return partition, community_louvain.modularity(partition, G, weight=weight)
+
+METHODS = {
+    'louvain': louvain_partition,
+    'leiden': leiden_partition,
+}
+
+def detect_communities(G, resolution=1.0, seed=42, method='louvain', use_cache=True, key=None):
+    # (partition dict, modularity); computed at most once per graph and parameter set
+    if method not in METHODS:
+        raise ValueError(f"Unknown community detection method: {method}")
+    key = key or graph_hash(G)
+    cache_key = f'communities-{key}-{method}-{resolution}-{seed}'
+    nodes = list(G.nodes())
+    if use_cache and cache_key in _memory_cache:
+        labels, modularity = _memory_cache[cache_key]
+        return dict(zip(nodes, labels)), modularity
+
+    cache_file = os.path.join(CACHE_DIR, f'{cache_key}.json')
+    if use_cache and os.path.exists(cache_file):
+        with open(cache_file, encoding='utf-8') as f:
+            cached = json.load(f)
+        labels, modularity = cached['labels'], cached['modularity']
+    else:
+        partition, modularity = METHODS[method](G, resolution=resolution, seed=seed)
+        labels = [int(partition[node]) for node in nodes]
+        if use_cache:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(cache_file, 'w', encoding='utf-8') as f:
+                json.dump({'labels': labels, 'modularity': modularity}, f)
+    if use_cache:
+        _memory_cache[cache_key] = (labels, modularity)
+    return dict(zip(nodes, labels)), modularity
+
+def partition_agreement(partitions):
+    # Mean pairwise adjusted Rand index and normalized mutual information;
+    # 1.0 means every seed found the same partition
+    from sklearn.metrics import adjusted_rand_score, normalized_mutual_info_score
+    if len(partitions) < 2:
+        return 1.0, 1.0
+    nodes = list(partitions[0])
+    labels = [[partition[node] for node in nodes] for partition in partitions]
+    pairs = list(itertools.combinations(labels, 2))
+    ari = np.mean([adjusted_rand_score(a, b) for a, b in pairs])
+    nmi = np.mean([normalized_mutual_info_score(a, b) for a, b in pairs])
+    return float(ari), float(nmi)
+
+def consensus_partition(partitions):
+    # The partition agreeing best (mean ARI) with all the others
+    from sklearn.metrics import adjusted_rand_score
+    if len(partitions) < 3:
+        return 0
+    nodes = list(partitions[0])
+    labels = [[partition[node] for node in nodes] for partition in partitions]
+    scores = [np.mean([adjusted_rand_score(a, b) for j, b in enumerate(labels) if j != i])
+              for i, a in enumerate(labels)]
+    return int(np.argmax(scores))
+
+def stable_communities(G, resolution=1.0, seeds=(42, 43, 44, 45, 46), method='louvain'):
+    # (consensus partition, its modularity, ARI, NMI) across seeds
+    key = graph_hash(G)
+    runs = [detect_communities(G, resolution=resolution, seed=seed, method=method, key=key)
+            for seed in seeds]
+    partitions = [partition for partition, _ in runs]
+    ari, nmi = partition_agreement(partitions)
+    best = consensus_partition(partitions)
+    return partitions[best], runs[best][1], ari, nmi
+
+def _is_cached(resolution, seed, method, key):
+    cache_key = f'communities-{key}-{method}-{resolution}-{seed}'
+    return cache_key in _memory_cache or os.path.exists(os.path.join(CACHE_DIR, f'{cache_key}.json'))
+
+def _init_worker(G):
+    global _worker_graph
+    _worker_graph = G
+
+def _detect(args):
+    resolution, seed, method, key = args
+    detect_communities(_worker_graph, resolution=resolution, seed=seed, method=method, key=key)
+
+def resolution_sweep(G, resolutions, seeds=(42,), method='louvain', workers=None):
+    # One row per resolution: community count, modularity and seed stability
+    # of the consensus partition. Uncached runs are spread over a process pool.
+    key = graph_hash(G)
+    tasks = [(resolution, seed, method, key) for resolution in resolutions for seed in seeds]
+    pending = [task for task in tasks if not _is_cached(*task)]
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(G,)) as pool:
+            # Workers write the disk cache, which the pass below then reads
+            list(pool.map(_detect, pending))
+    results = [detect_communities(G, resolution=r, seed=s, method=m, key=k) for r, s, m, k in tasks]
+
+    rows = []
+    for i, resolution in enumerate(resolutions):
+        runs = results[i * len(seeds):(i + 1) * len(seeds)]
+        partitions = [partition for partition, _ in runs]
+        ari, nmi = partition_agreement(partitions)
+        best = consensus_partition(partitions)
+        rows.append({
+            'resolution': resolution,
+            'communities': len(set(partitions[best].values())),
+            'modularity': runs[best][1],
+            'ari': ari,
+            'nmi': nmi,
+        })
+    return pd.DataFrame(rows).set_index('resolution')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Community detection sweep over Louvain/Leiden resolutions")
+    parser.add_argument("--nodes", default="nodes.csv")
+    parser.add_argument("--edges", default="edges.csv")
+    parser.add_argument("--method", choices=list(METHODS), default="louvain")
+    parser.add_argument("--resolutions", default="0.5,0.75,1.0,1.25,1.5",
+                        help="comma-separated resolution values")
+    parser.add_argument("--seeds", type=int, default=5,
+                        help="number of seeds per resolution (stability is measured across them)")
+    parser.add_argument("--seed", type=int, default=42, help="first seed")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=None, help="optional CSV for the sweep table")
+    args = parser.parse_args(argv)
+
+    from graph_loader import load_graph
+    G = load_graph(args.nodes, args.edges)
+    resolutions = [float(r) for r in args.resolutions.split(",") if r.strip()]
+    table = resolution_sweep(G, resolutions, seeds=range(args.seed, args.seed + args.seeds),
+                             method=args.method, workers=args.workers)
+    print(table.to_string(float_format=lambda x: f"{x:.3f}"))
+    if args.output:
+        table.to_csv(args.output)
+    return table
+
+if __name__ == "__main__":
+    main()
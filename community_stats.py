@@ -0,0 +1,63 @@
+# Vectorized node-strength and community statistics over edge arrays
+import numpy as np
+import pandas as pd
+
+def graph_arrays(G, weight='weight'):
+    # Node list plus integer edge arrays (source index, target index, weight)
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = list(G.edges(data=weight, default=1))
+    sources = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=len(edges))
+    targets = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=len(edges))
+    weights = np.fromiter((w for _, _, w in edges), dtype=np.float64, count=len(edges))
+    return nodes, sources, targets, weights
+
+def node_strength(n, sources, targets, weights):
+    # Sum of edge weights where each node appears as source or target
+    return (np.bincount(sources, weights=weights, minlength=n)
+            + np.bincount(targets, weights=weights, minlength=n))
+
+def community_stats(G, communities):
+    # One pass over the node table and the edge arrays; per-community values
+    # come from bincount/groupby over integer community codes
+    nodes, sources, targets, weights = graph_arrays(G)
+    attributes = pd.DataFrame([G.nodes[node] for node in nodes])
+    labels, community_ids = pd.factorize(pd.Series([communities[node] for node in nodes]))
+    k = len(community_ids)
+
+    size = np.bincount(labels, minlength=k)
+
+    # Edges are internal when both endpoints share a community
+    source_labels = labels[sources]
+    target_labels = labels[targets]
+    internal = source_labels == target_labels
+    internal_count = np.bincount(source_labels[internal], minlength=k)
+    internal_weight = np.bincount(source_labels[internal], weights=weights[internal], minlength=k)
+    external_count = (np.bincount(source_labels[~internal], minlength=k)
+                      + np.bincount(target_labels[~internal], minlength=k))
+    external_weight = (np.bincount(source_labels[~internal], weights=weights[~internal], minlength=k)
+                       + np.bincount(target_labels[~internal], weights=weights[~internal], minlength=k))
+
+    grouped = attributes.assign(community=labels).groupby('community')
+    cb_count = np.bincount(labels, weights=(attributes['order'] == 'CB').to_numpy(), minlength=k)
+
+    stats = pd.DataFrame({
+        'size': size,
+        'countries': grouped['country'].nunique(dropna=False).reindex(range(k)).to_numpy(),
+        'continents': grouped['continent'].nunique(dropna=False).reindex(range(k)).to_numpy(),
+        'avg_age': np.bincount(labels, weights=attributes['age'].to_numpy(dtype=float), minlength=k) / size,
+        'cb_count': cb_count.astype(np.int64),
+        'total_weight': np.bincount(labels, weights=attributes['weight'].to_numpy(dtype=float), minlength=k),
+        # Edge counts seen from each member, as a walk over every member's
+        # neighbours would count them: internal edges are counted twice
+        'internal_edges': 2 * internal_count,
+        'external_edges': external_count,
+        'cb_ratio': cb_count / size,
+        'internal_ratio': 2 * internal_count / np.maximum(2 * internal_count + external_count, 1),
+        'internal_weight': internal_weight,
+        'external_weight': external_weight,
+        'density': np.where(size > 1, internal_count / np.maximum(size * (size - 1) / 2, 1), 0.0),
+        'avg_degree': 2 * internal_count / size,
+        'avg_weight': np.bincount(labels, weights=attributes['weight'].to_numpy(dtype=float), minlength=k) / size,
+    }, index=pd.Index(community_ids, name='Community'))
+    return stats
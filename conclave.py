@@ -0,0 +1,248 @@
+# Single entry point for the whole project: the scripts' steps as a DAG of
+# cached stages. A stage reruns only when its key (parameters, source code and
+# the content of its input files) differs from the last successful run.
+import argparse
+import ast
+import hashlib
+import inspect
+import json
+import os
+import textwrap
+import time
+from code_hash import PROJECT_DIR, local_modules, module_closure
+from graph_loader import CACHE_DIR, file_hash
+from instrumentation import add_arguments, configure, span
+
+MANIFEST_FILE = os.path.join(CACHE_DIR, 'pipeline_manifest.json')
+
+class Stage:
+    # run(params) must write every file in outputs; inputs may be upstream
+    # outputs. The key covers the source of the code modules, of the project
+    # modules run imports, and of everything those import in turn.
+    def __init__(self, name, run, deps=(), inputs=(), outputs=(), params=(), code=()):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.params = tuple(params)
+        self.code = tuple(code)
+
+    def input_files(self, params):
+        # Templates like '{rules}' name a file through a parameter; empty means none
+        paths = [path.format(**params) for path in self.inputs]
+        return [path for path in paths if path]
+
+    def code_files(self):
+        roots = set(self.code) | local_modules(ast.parse(textwrap.dedent(inspect.getsource(self.run))))
+        return sorted(set().union(*(module_closure(path) for path in roots)))
+
+    def key(self, params):
+        digest = hashlib.sha256(self.name.encode())
+        digest.update(json.dumps({p: params[p] for p in self.params}, sort_keys=True).encode())
+        for path in self.code_files():
+            digest.update(f'{path}\0{file_hash(os.path.join(PROJECT_DIR, path))}\n'.encode())
+        for path in self.input_files(params):
+            digest.update(f'{path}\0{file_hash(path)}\n'.encode())
+        return digest.hexdigest()[:16]
+
+def run_generate(params):
+    from conclave_generate import generate_network
+    generate_network(engine=params['engine'], rules=params['rules'] or None,
+                     min_weight=params['min_weight'], top_k=params['top_k'],
+                     roster_file=params['roster'])
+
+def run_metrics(params):
+    import pandas as pd
+    from network_analysis import NetworkAnalysis
+    analysis = NetworkAnalysis(betweenness_samples=params['betweenness_samples'],
+                               seed=params['seed'], workers=params['workers'])
+    G = analysis.G
+    metrics = {
+        'nodes': G.number_of_nodes(),
+        'edges': G.number_of_edges(),
+        'diameter': analysis.diameter,
+        'average_shortest_path_length': analysis.average_shortest_path_length,
+        'average_clustering': analysis.average_clustering,
+        'average_weighted_clustering': analysis.clustering.average_weighted_clustering,
+        'transitivity': analysis.clustering.transitivity,
+        'spectral_radius': analysis.spectral.spectral_radius,
+        'spectral_clusters': len(set(analysis.spectral.clusters.values())),
+    }
+    with open('metrics.json', 'w', encoding='utf-8') as f:
+        json.dump(metrics, f, indent=2)
+    pd.DataFrame({
+        'Degree': analysis.degree_centrality,
+        'Closeness': analysis.closeness_centrality,
+        'Betweenness': analysis.betweenness_centrality,
+        'Eigenvector': analysis.spectral.eigenvector_centrality,
+        'PageRank': analysis.spectral.pagerank,
+        'Katz': analysis.spectral.katz_centrality,
+        'SpectralCluster': analysis.spectral.clusters,
+    }).rename_axis('Id').to_csv('node_metrics.csv')
+    print(f"Metrikák: {metrics['nodes']} csomópont, {metrics['edges']} él, "
+          f"átmérő {metrics['diameter']}, klaszterezettség {metrics['average_clustering']:.3f}")
+
+def run_communities(params):
+    import pandas as pd
+    from graph_loader import load_graph
+    from cluster_analysis import cluster_stats
+    from community_detection import stable_communities
+    G = load_graph('nodes.csv', 'edges.csv')
+    seeds = range(params['seed'], params['seed'] + params['stability_seeds'])
+    communities, modularity, ari, nmi = stable_communities(G, resolution=params['resolution'],
+                                                           seeds=seeds, method=params['method'])
+    pd.DataFrame({'Id': list(communities), 'Community': list(communities.values())}) \
+        .to_csv('communities.csv', index=False)
+    cluster_stats(G, communities).to_csv('cluster_stats.csv')
+    print(f"Közösségek: {len(set(communities.values()))}, modularitás {modularity:.3f}, "
+          f"stabilitás {len(seeds)} seed között: ARI {ari:.3f}, NMI {nmi:.3f}")
+
+def load_communities(path='communities.csv'):
+    import pandas as pd
+    df = pd.read_csv(path)
+    return dict(zip(df['Id'], df['Community'].tolist()))
+
+def run_render(params):
+    from graph_loader import load_graph
+    from cluster_analysis import cluster_stats, figure_jobs
+    from render_queue import render
+    G = load_graph('nodes.csv', 'edges.csv')
+    communities = load_communities()
+    stats_df = cluster_stats(G, communities)
+    render(figure_jobs(G, communities, stats_df, preview=params['preview'], seed=params['seed']),
+           workers=params['workers'], force=params['force'])
+
+def run_html(params):
+    from graph_loader import load_graph
+    from layout_cache import get_layout
+    from gephi_visualization import export_html, select_edges
+    G = load_graph('nodes.csv', 'edges.csv')
+    pos = get_layout(G, seed=params['seed'])
+    export_html(G, pos=pos, edges=select_edges(G, min_weight=params['html_min_weight']))
+
+# In dependency order; a requested stage pulls in its dependencies
+STAGES = {stage.name: stage for stage in [
+    Stage('generate', run_generate,
+          inputs=['{roster}', '{rules}'], outputs=['nodes.csv', 'edges.csv'],
+          params=['engine', 'min_weight', 'top_k'],
+          code=['conclave_generate.py']),
+    Stage('metrics', run_metrics, deps=['generate'],
+          inputs=['nodes.csv', 'edges.csv'], outputs=['metrics.json', 'node_metrics.csv'],
+          params=['betweenness_samples', 'seed'],
+          code=['network_analysis.py']),
+    Stage('communities', run_communities, deps=['generate'],
+          inputs=['nodes.csv', 'edges.csv'], outputs=['communities.csv', 'cluster_stats.csv'],
+          params=['method', 'resolution', 'seed', 'stability_seeds'],
+          code=['cluster_analysis.py']),
+    Stage('render', run_render, deps=['communities'],
+          inputs=['nodes.csv', 'edges.csv', 'communities.csv'],
+          outputs=['community_sizes.png', 'community_characteristics.png',
+                   'community_correlations.png', 'network_visualization.png'],
+          params=['preview', 'seed'],
+          code=['cluster_analysis.py']),
+    Stage('html', run_html, deps=['generate'],
+          inputs=['nodes.csv', 'edges.csv'], outputs=['conclave_network.html'],
+          params=['html_min_weight', 'seed'],
+          code=['gephi_visualization.py']),
+]}
+
+def resolve(names, stages=STAGES):
+    # Requested stages plus their transitive dependencies, in STAGES order
+    needed = set()
+    def visit(name):
+        if name not in needed:
+            needed.add(name)
+            for dep in stages[name].deps:
+                visit(dep)
+    for name in names:
+        visit(name)
+    return [name for name in stages if name in needed]
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, encoding='utf-8') as f:
+        return json.load(f)
+
+def save_manifest(manifest, manifest_file=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(manifest_file) or '.', exist_ok=True)
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+def is_fresh(stage, key, record):
+    # Same key, and the outputs are still the files this stage wrote
+    if not record or record.get('key') != key:
+        return False
+    outputs = record.get('outputs', {})
+    return all(os.path.exists(path) and outputs.get(path) == file_hash(path)
+               for path in stage.outputs)
+
+def run_pipeline(names, params, force=False, manifest_file=MANIFEST_FILE, stages=STAGES):
+    # Returns [(stage, status, seconds)] in execution order
+    manifest = load_manifest(manifest_file)
+    report = []
+    for name in resolve(names, stages):
+        stage = stages[name]
+        key = stage.key(params)
+        if not force and is_fresh(stage, key, manifest.get(name)):
+            report.append((name, 'gyorsítótárból', 0.0))
+            continue
+        print(f"\n=== {name} ===")
+        start = time.perf_counter()
+        with span(f'pipeline.{name}'):
+            stage.run(params)
+        seconds = time.perf_counter() - start
+        manifest[name] = {'key': key, 'outputs': {path: file_hash(path) for path in stage.outputs}}
+        save_manifest(manifest, manifest_file)
+        report.append((name, 'lefutott', seconds))
+    return report
+
+def print_report(report):
+    print("\nSzakaszok:")
+    for name, status, seconds in report:
+        print(f"- {name:<12} {status:<15} {seconds:8.2f}s")
+    print(f"Összesen: {sum(seconds for _, _, seconds in report):.2f}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='conclave', description='A bíborosi hálózat teljes feldolgozása')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='szakaszok futtatása (a változatlanok kimaradnak)')
+    run.add_argument('--stages', default=','.join(STAGES),
+                     help=f"vesszővel elválasztott szakaszok ({', '.join(STAGES)}); a függőségek is lefutnak")
+    run.add_argument('--force', action='store_true', help='minden szakasz újrafuttatása')
+    run.add_argument('--roster', default='data/cardinals.csv')
+    run.add_argument('--rules', default='', help='JSON/YAML súlyozási szabályok')
+    run.add_argument('--engine', choices=['numpy', 'sparse', 'loop'], default='numpy')
+    run.add_argument('--min-weight', type=float, default=1)
+    run.add_argument('--top-k', type=int, default=None)
+    run.add_argument('--betweenness-samples', type=int, default=None)
+    run.add_argument('--method', choices=['louvain', 'leiden'], default='louvain',
+                     help='közösségkereső módszer (a leiden opcionális csomagokat igényel)')
+    run.add_argument('--resolution', type=float, default=1.0, help='Louvain/Leiden felbontás')
+    run.add_argument('--stability-seeds', type=int, default=1,
+                     help='ennyi seed-del fut a közösségkeresés; a konszenzus partíció kerül kimenetre')
+    run.add_argument('--seed', type=int, default=42)
+    run.add_argument('--html-min-weight', type=float, default=None)
+    run.add_argument('--preview', action='store_true', help='gyors, alacsony felbontású ábrák')
+    run.add_argument('--workers', type=int, default=None)
+    add_arguments(run)
+    commands.add_parser('stages', help='a szakaszok és függőségeik listája')
+    args = parser.parse_args(argv)
+
+    if args.command == 'stages':
+        for stage in STAGES.values():
+            print(f"{stage.name}: {', '.join(stage.deps) or '-'} -> {', '.join(stage.outputs)}")
+        return
+
+    names = [name.strip() for name in args.stages.split(',') if name.strip()]
+    unknown = [name for name in names if name not in STAGES]
+    if unknown:
+        parser.error(f"ismeretlen szakasz: {', '.join(unknown)}")
+    configure(args)
+    report = run_pipeline(names, vars(args), force=args.force)
+    print_report(report)
+    return report
+
+if __name__ == '__main__':
+    main()
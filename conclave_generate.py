@@ -1,54 +1,29 @@
 # Import necessary libraries
-import pandas as pd
+import argparse
+import os
 import re
-import pycountry
-import pycountry_convert as pc
+import time
+import pandas as pd
+import scipy.sparse as sp
 from itertools import combinations
+import community_stats
+from incremental_update import save_snapshot, update_network
+from continent_resolver import ContinentResolver, default_resolver
+from roster_ingest import CHUNK_SIZE, read_roster
+from edge_store import EDGE_DIR, write_edge_frame
+from graph_loader import write_network_manifest
+from instrumentation import add_arguments, configure, count, span, traced
+from weight_engine import build_edges, build_sparse_edges, sweep_rules
+
+# Edge files written per --output-format, the preferred one first
+EDGE_FILES = {"csv": ["edges.csv"], "npy": [EDGE_DIR], "both": ["edges.csv", EDGE_DIR]}
 
 def get_continent(country_name):
-    try:
-        # Handle special cases
-        if country_name == "Jerusalem":
-            return "Asia"
-        if country_name == "China\n(Hong Kong)":
-            return "Asia"
-            
-        # Get country code
-        country = pycountry.countries.get(name=country_name)
-        if not country:
-            # Try with common_name
-            country = pycountry.countries.get(common_name=country_name)
-        if not country:
-            # Try with alpha_2
-            country = pycountry.countries.get(alpha_2=country_name)
-            
-        if country:
-            # Get continent code
-            continent_code = pc.country_alpha2_to_continent_code(country.alpha_2)
-            # Convert continent code to full name
-            continent_names = {
-                'NA': 'North America',
-                'SA': 'South America',
-                'AS': 'Asia',
-                'OC': 'Oceania',
-                'AF': 'Africa',
-                'EU': 'Europe'
-            }
-            return continent_names[continent_code]
-    except:
-        pass
-    return None
-
-def generate_network():
-    # Load the dataset
-    df = pd.read_csv(r'data/cardinals.csv', encoding="utf-8")
-    
-    # Remove annotations from country names
-    df["Country"] = df["Country"].apply(lambda x: re.sub(r"\[.*?\]", "", x).strip())
-    
-    # Add continent information
-    df["Continent"] = df["Country"].apply(get_continent)
-    
+    # Cached lookup; unresolved names are recorded in default_resolver.unresolved
+    return default_resolver.resolve(country_name)
+
+def pairwise_edges_loop(df):
+    # Reference implementation: one pandas row lookup per pair
     # Initialize list to store edges
     edges = []
     
@@ -99,23 +74,123 @@ def generate_network():
                 "Weight": weight
             })
 
-    # Create edges DataFrame
-    edges_df = pd.DataFrame(edges)
+    return pd.DataFrame(edges)
+
+def load_roster(roster_file="data/cardinals.csv", resolver=None, chunksize=CHUNK_SIZE):
+    # Chunked read with vectorized cleaning and continent resolution, typed
+    # columns (categoricals, int8 ages) for the pair engines
+    return read_roster(roster_file, resolver=resolver, chunksize=chunksize)
+
+@traced("generate")
+def generate_network(engine="numpy", rules=None, min_weight=1, top_k=None, tile_size=1024,
+                     continent_overrides=None, continent_cache=None,
+                     roster_file="data/cardinals.csv", incremental=False, output_format="csv",
+                     chunksize=CHUNK_SIZE):
+    resolver = None
+    if continent_overrides or continent_cache:
+        resolver = ContinentResolver(overrides=continent_overrides, cache_file=continent_cache)
+    df = load_roster(roster_file, resolver, chunksize=chunksize)
+    
+    # Patch the previous run's output when only part of the roster changed;
+    # the numpy engine keeps every positive weight, the sparse one applies its cutoffs
+    sparse_cutoffs = {"min_weight": min_weight, "top_k": top_k} if engine == "sparse" else {}
+    if incremental and engine in ("numpy", "sparse"):
+        result = update_network(df, rules=rules, **sparse_cutoffs)
+        if result is not None:
+            edges_df, node_strength = result
+            count("edges_emitted", len(edges_df))
+            if engine == "sparse":
+                save_sparse_matrix(df, edges_df)
+            write_network(df, edges_df, node_strength, output_format)
+            save_snapshot(df, rules, edges_file=EDGE_FILES[output_format][0], **sparse_cutoffs)
+            return
+    
+    # Compute weighted edges between all unique pairs of cardinals
+    start = time.perf_counter()
+    with span("generate.edges", engine=engine):
+        if engine == "loop":
+            edges_df = pairwise_edges_loop(df)
+        elif engine == "sparse":
+            # Tiled generation with a weight cutoff; row/col index nodes.csv order
+            matrix = build_sparse_edges(df, rules=rules, min_weight=min_weight,
+                                        top_k=top_k, tile_size=tile_size)
+            sp.save_npz("edges.npz", matrix)
+            names = df["Name"].to_numpy()
+            edges_df = pd.DataFrame({
+                "Source": names[matrix.row],
+                "Target": names[matrix.col],
+                "Weight": matrix.data
+            })
+        else:
+            edges_df = build_edges(df, rules=rules)
+        # A top-k cutoff scores every ordered pair, the other engines each pair once
+        n = len(df)
+        count("pairs_evaluated", n * (n - 1) if engine == "sparse" and top_k else n * (n - 1) // 2)
+        count("edges_emitted", len(edges_df))
+    print(f"Edge generation ({engine}) took {time.perf_counter() - start:.4f}s")
     
     # Sum weights where each node appears as Source or Target
-    node_strength = (
-        edges_df.groupby("Source")["Weight"].sum()
-        .add(edges_df.groupby("Target")["Weight"].sum(), fill_value=0)
-        .reset_index()
-        .rename(columns={0: "Weight", "index": "Name"})
-    )
+    position = pd.Index(df["Name"])
+    node_strength = pd.DataFrame({
+        "Name": df["Name"],
+        "Weight": community_stats.node_strength(
+            len(df),
+            position.get_indexer(edges_df["Source"]),
+            position.get_indexer(edges_df["Target"]),
+            edges_df["Weight"].to_numpy(dtype=float)
+        )
+    })
+
+    write_network(df, edges_df, node_strength, output_format)
+
+    # Snapshot for later incremental updates
+    if engine == "sparse":
+        print("Sparse matrix saved: edges.npz")
+    save_snapshot(df, rules, edges_file=EDGE_FILES[output_format][0], **sparse_cutoffs)
+
+@traced("generate.sweep")
+def generate_sweep(sweep_file, output_dir="sweep", continent_overrides=None, continent_cache=None,
+                   roster_file="data/cardinals.csv", chunksize=CHUNK_SIZE):
+    # One edges_<variant>.csv per rule set of a sweep file, plus a summary;
+    # nodes.csv/edges.csv of the main network are left untouched
+    resolver = None
+    if continent_overrides or continent_cache:
+        resolver = ContinentResolver(overrides=continent_overrides, cache_file=continent_cache)
+    df = load_roster(roster_file, resolver, chunksize=chunksize)
+    os.makedirs(output_dir, exist_ok=True)
 
+    rows = []
+    for name, edges_df in sweep_rules(df, sweep_file).items():
+        stem = re.sub(r"[^\w.-]+", "_", str(name))
+        path = os.path.join(output_dir, f"edges_{stem}.csv")
+        edges_df.to_csv(path, index=False)
+        count("edges_emitted", len(edges_df))
+        rows.append({"Variant": name, "Edges": len(edges_df),
+                     "Total_weight": edges_df["Weight"].sum(), "File": path})
+    summary = pd.DataFrame(rows)
+    summary.to_csv(os.path.join(output_dir, "summary.csv"), index=False)
+    print(summary.to_string(index=False))
+    print(f"Files saved: {len(rows)} edge lists and summary.csv in {output_dir}/")
+
+def save_sparse_matrix(df, edges_df):
+    # edges.npz for an edge list patched by an incremental update
+    position = pd.Index(df["Name"])
+    matrix = sp.coo_array((edges_df["Weight"].to_numpy(),
+                           (position.get_indexer(edges_df["Source"]),
+                            position.get_indexer(edges_df["Target"]))),
+                          shape=(len(df), len(df)))
+    sp.save_npz("edges.npz", matrix)
+
+@traced("generate.write")
+def write_network(df, edges_df, node_strength, output_format="csv"):
     # Merge with all cardinal names to ensure all nodes are included
     all_nodes = df[["Name"]].copy()
     nodes_df = all_nodes.merge(node_strength, on="Name", how="left").fillna(0)
     
-    # Export edges.csv for Gephi
-    edges_df.to_csv("edges.csv", index=False)
+    # Export edges.csv for Gephi; an npy-only run leaves an existing one in
+    # place, the network manifest tells the loaders it is not current
+    if output_format in ("csv", "both"):
+        edges_df.to_csv("edges.csv", index=False)
 
     # Export nodes.csv for Gephi (Id, Label, Weight + optional attributes)
     nodes_export = df[["Name", "Country", "Continent", "Order", "Age"]].copy()
@@ -133,10 +208,63 @@ def generate_network():
 
     # Save nodes.csv
     nodes_export.to_csv("nodes.csv", index=False)
+
+    # Columnar store: node table plus int32/uint8 edge arrays
+    if output_format in ("npy", "both"):
+        write_edge_frame(EDGE_DIR, nodes_export, edges_df)
+
+    # Which edge files this run wrote, for the loaders (graph_loader.resolve_edges_file)
+    write_network_manifest(output_format, EDGE_FILES[output_format])
     
     print("Network generation complete!")
     print(f"Generated {len(edges_df)} edges and {len(nodes_df)} nodes")
-    print("Files saved: edges.csv and nodes.csv")
+    saved = {"csv": "edges.csv", "npy": f"{EDGE_DIR}/", "both": f"edges.csv, {EDGE_DIR}/"}[output_format]
+    print(f"Files saved: {saved} and nodes.csv")
 
 if __name__ == "__main__":
-    generate_network() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the cardinals network")
+    parser.add_argument("--engine", choices=["numpy", "sparse", "loop"], default="numpy",
+                        help="pairwise weight engine (loop is the original per-pair implementation, "
+                             "sparse writes a tiled, thresholded scipy.sparse COO matrix to edges.npz)")
+    parser.add_argument("--rules", default=None,
+                        help="JSON/YAML weighting rule spec (defaults to weight_engine.DEFAULT_RULES)")
+    parser.add_argument("--sweep", default=None,
+                        help="JSON/YAML sweep file (a list of rule sets): write one edge list per "
+                             "variant to --sweep-dir instead of generating the network")
+    parser.add_argument("--sweep-dir", default="sweep",
+                        help="output directory of --sweep")
+    parser.add_argument("--min-weight", type=float, default=1,
+                        help="sparse engine: drop edges lighter than this")
+    parser.add_argument("--top-k", type=int, default=None,
+                        help="sparse engine: keep only the k strongest edges of every node")
+    parser.add_argument("--tile-size", type=int, default=1024,
+                        help="sparse engine: nodes per tile, bounds peak memory")
+    parser.add_argument("--continent-overrides", default=None,
+                        help="JSON or CSV (Country,Continent) table of manual continent assignments")
+    parser.add_argument("--continent-cache", default=None,
+                        help="JSON file persisting resolved continents between runs")
+    parser.add_argument("--roster", default="data/cardinals.csv",
+                        help="roster CSV to build the network from")
+    parser.add_argument("--incremental", action="store_true",
+                        help="numpy/sparse engine (without --top-k): patch the previous run's network "
+                             "for the rows changed since then")
+    parser.add_argument("--output-format", choices=["csv", "npy", "both"], default="csv",
+                        help=f"csv: Gephi edges.csv; npy: columnar {EDGE_DIR}/ store (int32 source/target, "
+                             "uint8 weight .npy arrays, memory-mapped by the loaders); both: write both")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE,
+                        help="roster rows parsed per chunk, bounds memory while reading large rosters")
+    add_arguments(parser)
+    args = parser.parse_args()
+    configure(args)
+    if args.sweep:
+        generate_sweep(args.sweep, output_dir=args.sweep_dir,
+                       continent_overrides=args.continent_overrides,
+                       continent_cache=args.continent_cache,
+                       roster_file=args.roster, chunksize=args.chunksize)
+    else:
+        generate_network(engine=args.engine, rules=args.rules, min_weight=args.min_weight,
+                         top_k=args.top_k, tile_size=args.tile_size,
+                         continent_overrides=args.continent_overrides,
+                         continent_cache=args.continent_cache,
+                         roster_file=args.roster, incremental=args.incremental,
+                         output_format=args.output_format, chunksize=args.chunksize)
@@ -0,0 +1,109 @@
+# Country -> continent resolution backed by a one-time pycountry index
+import csv
+import json
+import os
+from functools import lru_cache
+import pycountry
+import pycountry_convert as pc
+
+CONTINENT_NAMES = {
+    'NA': 'North America',
+    'SA': 'South America',
+    'AS': 'Asia',
+    'OC': 'Oceania',
+    'AF': 'Africa',
+    'EU': 'Europe'
+}
+
+# Names in the roster that are not countries in ISO 3166
+DEFAULT_OVERRIDES = {
+    "Jerusalem": "Asia",
+    "China\n(Hong Kong)": "Asia",
+}
+
+# pycountry attributes indexed for lookup, in order of precedence
+INDEX_FIELDS = ("name", "common_name", "official_name", "alpha_2")
+
+def load_overrides(path):
+    # Override table as JSON ({"Country": "Continent"}) or CSV (Country,Continent)
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return {row["Country"]: row["Continent"] for row in csv.DictReader(f)}
+
+class ContinentResolver:
+    def __init__(self, overrides=None, cache_file=None, cache_size=4096):
+        self.overrides = dict(DEFAULT_OVERRIDES)
+        if isinstance(overrides, str):
+            overrides = load_overrides(overrides)
+        self.overrides.update(overrides or {})
+        self.cache_file = cache_file
+        self.unresolved = {}
+        self._index = None
+        self._disk_cache = {}
+        self._dirty = False
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, encoding="utf-8") as f:
+                self._disk_cache = json.load(f)
+        self.resolve = lru_cache(maxsize=cache_size)(self._resolve)
+
+    @property
+    def index(self):
+        # Lower-cased lookup key -> alpha_2, built on first use
+        if self._index is None:
+            index = {}
+            for field in INDEX_FIELDS:
+                for country in pycountry.countries:
+                    value = getattr(country, field, None)
+                    if value:
+                        index.setdefault(value.lower(), country.alpha_2)
+            self._index = index
+        return self._index
+
+    def _resolve(self, country_name):
+        if country_name in self.overrides:
+            return self.overrides[country_name]
+        if not isinstance(country_name, str):
+            self.unresolved[country_name] = "not a country name"
+            return None
+        if country_name in self._disk_cache:
+            return self._disk_cache[country_name]
+
+        alpha_2 = self.index.get(country_name.strip().lower())
+        if alpha_2 is None:
+            self.unresolved[country_name] = "unknown country"
+            return None
+        try:
+            continent_code = pc.country_alpha2_to_continent_code(alpha_2)
+        except KeyError:
+            self.unresolved[country_name] = f"no continent for {alpha_2}"
+            return None
+        if continent_code not in CONTINENT_NAMES:
+            self.unresolved[country_name] = f"unsupported continent {continent_code}"
+            return None
+
+        continent = CONTINENT_NAMES[continent_code]
+        self._disk_cache[country_name] = continent
+        self._dirty = True
+        return continent
+
+    def resolve_many(self, countries):
+        # Resolve each distinct value once and return a Series aligned with countries
+        mapping = {country: self.resolve(country) for country in countries.unique()}
+        return countries.map(mapping)
+
+    def save(self):
+        if self.cache_file and self._dirty:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self._disk_cache, f, ensure_ascii=False, indent=2, sort_keys=True)
+            self._dirty = False
+
+    def report(self):
+        if not self.unresolved:
+            return
+        print(f"Could not resolve a continent for {len(self.unresolved)} countries:")
+        for country, reason in self.unresolved.items():
+            print(f"  {country!r}: {reason}")
+
+# Shared resolver used by get_continent
+default_resolver = ContinentResolver()
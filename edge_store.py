@@ -0,0 +1,82 @@
+# Columnar binary network format: a directory holding the node table and the
+# edge list as three memory-mappable .npy arrays indexing into it
+#   nodes.csv   node table (same columns as the Gephi nodes.csv)
+#   source.npy  int32 row of the source node in nodes.csv
+#   target.npy  int32 row of the target node
+#   weight.npy  uint8 when every weight is a small non-negative integer,
+#               otherwise the weights' own dtype
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+EDGE_DIR = 'network'
+ARRAY_FILES = ('source.npy', 'target.npy', 'weight.npy')
+
+def is_edge_dir(path):
+    return os.path.isdir(path) and all(os.path.exists(os.path.join(path, name)) for name in ARRAY_FILES)
+
+def store_files(directory):
+    # Every file of the store, in a fixed order (for content hashing)
+    return [os.path.join(directory, name) for name in ('nodes.csv',) + ARRAY_FILES]
+
+def compact_weights(weights):
+    weights = np.asarray(weights)
+    if len(weights) and np.issubdtype(weights.dtype, np.floating) and not np.all(weights == np.round(weights)):
+        return weights
+    if len(weights) == 0 or (weights.min() >= 0 and weights.max() <= np.iinfo(np.uint8).max):
+        return weights.astype(np.uint8)
+    return weights
+
+def write_edge_arrays(directory, nodes_df, sources, targets, weights):
+    # sources/targets are row positions in nodes_df
+    os.makedirs(directory, exist_ok=True)
+    nodes_df.to_csv(os.path.join(directory, 'nodes.csv'), index=False)
+    np.save(os.path.join(directory, 'source.npy'), np.asarray(sources, dtype=np.int32))
+    np.save(os.path.join(directory, 'target.npy'), np.asarray(targets, dtype=np.int32))
+    np.save(os.path.join(directory, 'weight.npy'), compact_weights(weights))
+
+def write_edge_frame(directory, nodes_df, edges_df):
+    # Source/Target names -> positions in the node table
+    position = pd.Index(nodes_df['Id'])
+    write_edge_arrays(directory, nodes_df,
+                      position.get_indexer(edges_df['Source']),
+                      position.get_indexer(edges_df['Target']),
+                      edges_df['Weight'].to_numpy())
+
+def read_edge_arrays(directory, mmap=True):
+    # (nodes_df, sources, targets, weights); with mmap the arrays are
+    # read-only views of the files, nothing is parsed or copied
+    mode = 'r' if mmap else None
+    nodes_df = pd.read_csv(os.path.join(directory, 'nodes.csv'))
+    sources, targets, weights = (np.load(os.path.join(directory, name), mmap_mode=mode)
+                                 for name in ARRAY_FILES)
+    return nodes_df, sources, targets, weights
+
+def read_edge_frame(directory):
+    # Source/Target/Weight frame with node names, as in edges.csv
+    nodes_df, sources, targets, weights = read_edge_arrays(directory)
+    names = nodes_df['Id'].to_numpy()
+    return pd.DataFrame({
+        'Source': names[sources],
+        'Target': names[targets],
+        'Weight': np.asarray(weights).astype(np.int64) if weights.dtype == np.uint8 else np.asarray(weights)
+    })
+
+def export_csv(directory=EDGE_DIR, edges_file='edges.csv', nodes_file='nodes.csv'):
+    # Gephi-compatible CSV pair from a columnar store
+    read_edge_frame(directory).to_csv(edges_file, index=False)
+    if nodes_file:
+        pd.read_csv(os.path.join(directory, 'nodes.csv')).to_csv(nodes_file, index=False)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a columnar network store as Gephi CSV files")
+    parser.add_argument("directory", nargs="?", default=EDGE_DIR)
+    parser.add_argument("--edges", default="edges.csv")
+    parser.add_argument("--nodes", default="nodes.csv")
+    args = parser.parse_args(argv)
+    export_csv(args.directory, args.edges, args.nodes)
+    print(f"Files saved: {args.edges} and {args.nodes}")
+
+if __name__ == "__main__":
+    main()
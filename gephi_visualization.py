@@ -1,84 +1,144 @@
-import pandas as pd
-import networkx as nx
+import argparse
+import json
+import numpy as np
 from pyvis.network import Network
-import matplotlib.pyplot as plt
-
-# Load the data
-nodes_df = pd.read_csv('nodes.csv')
-edges_df = pd.read_csv('edges.csv')
-
-# Create a NetworkX graph
-G = nx.Graph()
-
-# Add nodes with attributes
-for _, row in nodes_df.iterrows():
-    G.add_node(row['Id'], 
-               country=row['Country'],
-               continent=row['Continent'],
-               order=row['Order'],
-               age=row['Age'],
-               weight=row['Weight'])
-
-# Add edges with weights
-for _, row in edges_df.iterrows():
-    G.add_edge(row['Source'], row['Target'], weight=row['Weight'])
-
-# Create an interactive visualization using pyvis
-net = Network(height="750px", width="100%", bgcolor="#ffffff", font_color="black")
-
-# Add nodes with custom properties
-for node in G.nodes():
-    node_data = G.nodes[node]
-    net.add_node(node,
-                label=node,
-                title=f"Country: {node_data['country']}<br>Continent: {node_data['continent']}<br>Age: {node_data['age']}",
-                size=node_data['weight']/50)  # Scale node size based on weight
-
-# Add edges
-for edge in G.edges(data=True):
-    net.add_edge(edge[0], edge[1], value=edge[2]['weight'])
-
-# Set the physics layout
-net.set_options("""
-{
-  "physics": {
-    "forceAtlas2Based": {
-      "gravitationalConstant": -50,
-      "centralGravity": 0.01,
-      "springLength": 100,
-      "springConstant": 0.08
-    },
-    "maxVelocity": 50,
-    "solver": "forceAtlas2Based",
-    "timestep": 0.35,
-    "stabilization": {
-      "enabled": true,
-      "iterations": 1000
+from graph_loader import load_graph
+from layout_cache import LAYOUT_METHODS, get_layout
+from community_stats import graph_arrays, node_strength
+from static_render import draw_network
+from instrumentation import add_arguments, configure, count, span
+
+# Pixel scale for baked-in layout coordinates (spring_layout returns [-1, 1])
+LAYOUT_SCALE = 1000
+
+# Physics settings of the original interactive export
+PHYSICS_OPTIONS = {
+    "physics": {
+        "forceAtlas2Based": {
+            "gravitationalConstant": -50,
+            "centralGravity": 0.01,
+            "springLength": 100,
+            "springConstant": 0.08
+        },
+        "maxVelocity": 50,
+        "solver": "forceAtlas2Based",
+        "timestep": 0.35,
+        "stabilization": {
+            "enabled": True,
+            "iterations": 1000
+        }
     }
-  }
 }
-""")
-
-# Save the interactive visualization
-net.save_graph("conclave_network.html")
-
-# Create a static visualization using matplotlib
-plt.figure(figsize=(15, 15))
-pos = nx.spring_layout(G, k=1, iterations=50)
-nx.draw(G, pos,
-        with_labels=True,
-        node_color='lightblue',
-        node_size=[G.nodes[node]['weight']/10 for node in G.nodes()],
-        font_size=8,
-        font_weight='bold',
-        edge_color='gray',
-        width=[G[u][v]['weight']/5 for u,v in G.edges()],
-        alpha=0.7)
-
-plt.title("Conclave Network Visualization")
-plt.savefig("conclave_network_static.png", dpi=300, bbox_inches='tight')
-plt.close()
-
-print("Visualization files have been created:")
-print("1. conclave_network.html - Interactive visualization")
-print("2. conclave_network_static.png - Static visualization") 
\ No newline at end of file
+
+# Precomputed layout: the browser only draws, it never simulates
+STATIC_OPTIONS = {
+    "physics": {"enabled": False},
+    "edges": {"smooth": False},
+    "interaction": {"hideEdgesOnDrag": True}
+}
+
+def backbone_edges(G, alpha=0.05):
+    # Disparity filter (Serrano et al.): keep an edge if it carries a
+    # significant share of the strength of at least one endpoint
+    nodes, sources, targets, weights = graph_arrays(G)
+    strength = node_strength(len(nodes), sources, targets, weights)
+    degree = np.bincount(sources, minlength=len(nodes)) + np.bincount(targets, minlength=len(nodes))
+
+    def significance(ends):
+        share = weights / strength[ends]
+        return (1 - share) ** (degree[ends] - 1)
+
+    keep = (np.minimum(significance(sources), significance(targets)) < alpha) | \
+           (degree[sources] == 1) | (degree[targets] == 1)
+    return [(nodes[u], nodes[v]) for u, v in zip(sources[keep], targets[keep])]
+
+def select_edges(G, min_weight=None, backbone_alpha=None):
+    # Edges to draw: optionally weight-thresholded and/or reduced to the backbone
+    if backbone_alpha is not None:
+        edges = backbone_edges(G, alpha=backbone_alpha)
+    else:
+        edges = list(G.edges())
+    if min_weight is not None:
+        edges = [(u, v) for u, v in edges if G[u][v]['weight'] >= min_weight]
+    return edges
+
+def export_html(G, output="conclave_network.html", pos=None, edges=None):
+    # Create an interactive visualization using pyvis; with pos the layout is
+    # baked into the nodes and physics is turned off
+    net = Network(height="750px", width="100%", bgcolor="#ffffff", font_color="black")
+
+    # Add nodes with custom properties
+    for node in G.nodes():
+        node_data = G.nodes[node]
+        position = {}
+        if pos is not None:
+            x, y = pos[node]
+            position = {"x": float(x) * LAYOUT_SCALE, "y": float(y) * LAYOUT_SCALE}
+        net.add_node(node,
+                    label=node,
+                    title=f"Country: {node_data['country']}<br>Continent: {node_data['continent']}<br>Age: {node_data['age']}",
+                    size=node_data['weight']/50,  # Scale node size based on weight
+                    **position)
+
+    # Add edges
+    for u, v in (edges if edges is not None else G.edges()):
+        net.add_edge(u, v, value=G[u][v]['weight'])
+
+    # Set the physics layout
+    net.set_options(json.dumps(STATIC_OPTIONS if pos is not None else PHYSICS_OPTIONS))
+
+    # Save the interactive visualization
+    net.save_graph(output)
+
+def export_static(G, pos, output="conclave_network_static.png", preview=False):
+    # Create a static visualization using matplotlib
+    draw_network(G, pos, output,
+                 node_color='lightblue',
+                 edge_width_scale=0.2,
+                 edge_alpha=0.7,
+                 node_alpha=0.7,
+                 font_weight='bold',
+                 title="Conclave Network Visualization",
+                 dpi=300,
+                 preview=preview,
+                 bbox_inches='tight')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export the cardinals network for the browser and as a PNG")
+    parser.add_argument("--physics", action="store_true",
+                        help="let the browser run the forceAtlas2 simulation instead of baking in a layout")
+    parser.add_argument("--min-weight", type=float, default=None,
+                        help="drop edges lighter than this from the HTML export")
+    parser.add_argument("--backbone", type=float, default=None, metavar="ALPHA",
+                        help="keep only the disparity-filter backbone at significance ALPHA (e.g. 0.05)")
+    parser.add_argument("--seed", type=int, default=42, help="layout seed")
+    parser.add_argument("--layout", choices=["auto"] + list(LAYOUT_METHODS), default="auto",
+                        help="layout algorithm (auto picks multilevel for large graphs)")
+    parser.add_argument("--preview", action="store_true",
+                        help="render the PNG at preview resolution")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    configure(args)
+
+    # Load the data
+    with span("gephi.load_graph"):
+        G = load_graph('nodes.csv', 'edges.csv')
+        count("nodes", G.number_of_nodes())
+        count("edges", G.number_of_edges())
+    with span("gephi.layout", method=args.layout):
+        pos = get_layout(G, method=args.layout, seed=args.seed)
+
+    with span("gephi.select_edges"):
+        edges = select_edges(G, min_weight=args.min_weight, backbone_alpha=args.backbone)
+        count("edges_exported", len(edges))
+    with span("gephi.html"):
+        export_html(G, pos=None if args.physics else pos, edges=edges)
+    with span("gephi.static"):
+        export_static(G, pos, preview=args.preview)
+
+    print("Visualization files have been created:")
+    print(f"1. conclave_network.html - Interactive visualization ({len(edges)} of {G.number_of_edges()} edges)")
+    print("2. conclave_network_static.png - Static visualization")
+
+if __name__ == "__main__":
+    main()
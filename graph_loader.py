@@ -0,0 +1,172 @@
+# Shared NetworkX graph loader with a binary snapshot cache
+import glob
+import hashlib
+import json
+import os
+import pickle
+import networkx as nx
+import pandas as pd
+from edge_store import EDGE_DIR, is_edge_dir, read_edge_arrays, store_files
+
+CACHE_DIR = '.conclave_cache'
+
+# Pickled graphs kept in CACHE_DIR, most recently used first; every new
+# edges file content adds one, so older ones are pruned
+GRAPH_CACHE_SIZE = 4
+
+# Edge files written by the last conclave_generate run, with content hashes
+NETWORK_MANIFEST = os.path.join(CACHE_DIR, 'network_manifest.json')
+
+# nodes.csv column -> node attribute name
+NODE_ATTRIBUTES = {
+    'Country': 'country',
+    'Continent': 'continent',
+    'Order': 'order',
+    'Age': 'age',
+    'Weight': 'weight'
+}
+
+def file_hash(*paths):
+    # Content hash of one or more files, used as a cache key
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def graph_from_frames(nodes_df, edges_df):
+    # Build the graph in bulk: nodes keep nodes.csv order, then edges in file order
+    G = nx.Graph()
+    attributes = nodes_df[list(NODE_ATTRIBUTES)].rename(columns=NODE_ATTRIBUTES)
+    G.add_nodes_from(zip(nodes_df['Id'].tolist(), attributes.to_dict('records')))
+    G.add_weighted_edges_from(zip(edges_df['Source'].tolist(),
+                                  edges_df['Target'].tolist(),
+                                  edges_df['Weight'].tolist()))
+    return G
+
+def graph_from_arrays(nodes_df, sources, targets, weights):
+    # Same graph as graph_from_frames, straight from columnar edge arrays
+    G = nx.Graph()
+    attributes = nodes_df[list(NODE_ATTRIBUTES)].rename(columns=NODE_ATTRIBUTES)
+    G.add_nodes_from(zip(nodes_df['Id'].tolist(), attributes.to_dict('records')))
+    names = nodes_df['Id'].to_numpy()
+    G.add_weighted_edges_from(zip(names[sources].tolist(),
+                                  names[targets].tolist(),
+                                  weights.tolist()))
+    return G
+
+def edge_files(edges_file):
+    # Every file behind an edges path (a CSV or a columnar store directory)
+    return store_files(edges_file) if is_edge_dir(edges_file) else [edges_file]
+
+def _file_state(path):
+    files = edge_files(path)
+    stats = [os.stat(name) for name in files]
+    return {
+        'hash': file_hash(*files),
+        'mtime_ns': max(stat.st_mtime_ns for stat in stats),
+        'size': sum(stat.st_size for stat in stats),
+    }
+
+def write_network_manifest(output_format, edges_paths, nodes_file='nodes.csv',
+                           manifest_file=NETWORK_MANIFEST):
+    # Record which edge files a generate run wrote (first path preferred)
+    manifest = {
+        'format': output_format,
+        'nodes': nodes_file,
+        'edges': {path: _file_state(path) for path in edges_paths},
+    }
+    os.makedirs(os.path.dirname(manifest_file) or '.', exist_ok=True)
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def read_network_manifest(manifest_file=NETWORK_MANIFEST):
+    if not os.path.exists(manifest_file):
+        return None
+    with open(manifest_file, encoding='utf-8') as f:
+        return json.load(f)
+
+def is_generated(path, state):
+    # path still holds what the generate run wrote; the hash is only
+    # recomputed when the modification time or size differ
+    if not (os.path.exists(path) and (is_edge_dir(path) or os.path.isfile(path))):
+        return False
+    files = edge_files(path)
+    stats = [os.stat(name) for name in files]
+    if (max(stat.st_mtime_ns for stat in stats) == state['mtime_ns']
+            and sum(stat.st_size for stat in stats) == state['size']):
+        return True
+    return file_hash(*files) == state['hash']
+
+def resolve_edges_file(edges_file='edges.csv', manifest_file=NETWORK_MANIFEST):
+    # The default edges.csv resolves to whichever edges the last generate run
+    # wrote, so a left-over edges.csv from an earlier csv run is not read next
+    # to a fresh npy store; an explicitly named store is used as given
+    manifest = read_network_manifest(manifest_file)
+    if manifest and edges_file == 'edges.csv':
+        generated = manifest['edges']
+        if edges_file in generated and is_generated(edges_file, generated[edges_file]):
+            return edges_file
+        for path, state in generated.items():
+            if is_generated(path, state):
+                return path
+    # No (matching) manifest: fall back to the columnar store when only that exists
+    if not os.path.exists(edges_file) and is_edge_dir(EDGE_DIR):
+        return EDGE_DIR
+    return edges_file
+
+def load_graph(nodes_file='nodes.csv', edges_file='edges.csv', use_cache=True):
+    # Return the graph for nodes_file/edges_file, reusing a pickled snapshot
+    # when both files are unchanged since it was written. edges_file may be a
+    # columnar store directory (edge_store.py); its own node table is used then.
+    edges_file = resolve_edges_file(edges_file)
+    columnar = is_edge_dir(edges_file)
+    cache_file = None
+    if use_cache:
+        key = file_hash(*store_files(edges_file)) if columnar else file_hash(nodes_file, edges_file)
+        cache_file = os.path.join(CACHE_DIR, f'graph-{key}.pkl')
+        if os.path.exists(cache_file):
+            with open(cache_file, 'rb') as f:
+                G = pickle.load(f)
+            # Mark as recently used for prune_graph_cache
+            os.utime(cache_file)
+            return G
+
+    if columnar:
+        G = graph_from_arrays(*read_edge_arrays(edges_file))
+    else:
+        G = graph_from_frames(pd.read_csv(nodes_file), pd.read_csv(edges_file))
+
+    if cache_file:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_file, 'wb') as f:
+            pickle.dump(G, f, protocol=pickle.HIGHEST_PROTOCOL)
+        prune_graph_cache()
+    return G
+
+def prune_graph_cache(keep=GRAPH_CACHE_SIZE):
+    # Delete all but the keep most recently used graph pickles
+    def last_used(path):
+        try:
+            return os.path.getmtime(path)
+        except FileNotFoundError:
+            return 0
+    pickles = sorted(glob.glob(os.path.join(CACHE_DIR, 'graph-*.pkl')), key=last_used, reverse=True)
+    for path in pickles[keep:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Pruned concurrently by another process
+            pass
+
+def graph_hash(G, weight='weight'):
+    # Content hash of a graph's nodes, edges and edge weights
+    digest = hashlib.sha256()
+    for node in G.nodes():
+        digest.update(f'{node}\0'.encode())
+    digest.update(b'\1')
+    for u, v, w in G.edges(data=weight):
+        digest.update(f'{u}\0{v}\0{w}\n'.encode())
+    return digest.hexdigest()[:16]
@@ -0,0 +1,77 @@
+# Distance-based metrics from a single all-pairs shortest-path pass
+from functools import cached_property
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import shortest_path
+
+class DistanceMetrics:
+    # All metrics are derived from one n x n distance matrix (BFS per source for
+    # hop counts, Dijkstra on 1/Weight when weighted=True)
+    def __init__(self, G, weighted=False, weight='weight'):
+        self.nodes = list(G.nodes())
+        self.weighted = weighted
+        adjacency = nx.to_scipy_sparse_array(G, nodelist=self.nodes,
+                                             weight=weight if weighted else None,
+                                             format='csr')
+        if weighted:
+            # Stronger ties are shorter: distance = 1 / Weight
+            adjacency.data = 1.0 / adjacency.data
+        self.distances = shortest_path(adjacency, method='D', directed=False,
+                                       unweighted=not weighted)
+
+    @property
+    def n(self):
+        return len(self.nodes)
+
+    @cached_property
+    def is_connected(self):
+        return self.n > 0 and bool(np.isfinite(self.distances).all())
+
+    def _require_connected(self):
+        if not self.is_connected:
+            raise nx.NetworkXError("Graph is not connected: infinite path length")
+
+    @cached_property
+    def eccentricity_array(self):
+        self._require_connected()
+        return self.distances.max(axis=1)
+
+    @cached_property
+    def eccentricity(self):
+        return dict(zip(self.nodes, self.eccentricity_array.tolist()))
+
+    @cached_property
+    def diameter(self):
+        return self._as_number(self.eccentricity_array.max())
+
+    @cached_property
+    def radius(self):
+        return self._as_number(self.eccentricity_array.min())
+
+    @cached_property
+    def average_shortest_path_length(self):
+        self._require_connected()
+        if self.n < 2:
+            return 0
+        return float(self.distances.sum() / (self.n * (self.n - 1)))
+
+    @cached_property
+    def closeness_centrality(self):
+        # Same definition as nx.closeness_centrality (Wasserman-Faust scaling
+        # for nodes that cannot reach the whole graph)
+        finite = np.isfinite(self.distances)
+        reachable = finite.sum(axis=1) - 1
+        totals = np.where(finite, self.distances, 0).sum(axis=1)
+        closeness = np.zeros(self.n)
+        mask = (totals > 0) & (self.n > 1)
+        closeness[mask] = reachable[mask] / totals[mask]
+        if self.n > 1:
+            closeness[mask] *= reachable[mask] / (self.n - 1)
+        return dict(zip(self.nodes, closeness.tolist()))
+
+    def _as_number(self, value):
+        # Hop counts are integers, as returned by NetworkX
+        return float(value) if self.weighted else int(value)
+
+def distance_metrics(G, weighted=False, weight='weight'):
+    return DistanceMetrics(G, weighted=weighted, weight=weight)
@@ -0,0 +1,161 @@
+# Incremental network update when the cardinals roster changes
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from edge_store import is_edge_dir, read_edge_frame
+from graph_loader import CACHE_DIR, edge_files, file_hash
+from weight_engine import EncodedRoster, compile_rules
+
+SNAPSHOT_FILE = os.path.join(CACHE_DIR, 'roster_snapshot.pkl')
+
+def network_hash(edges_file, nodes_file='nodes.csv'):
+    return file_hash(nodes_file, *edge_files(edges_file))
+
+def save_snapshot(df, rules=None, min_weight=None, top_k=None, edges_file='edges.csv',
+                  nodes_file='nodes.csv', snapshot_file=SNAPSHOT_FILE):
+    # Remember the roster and weighting the written network was generated
+    # from, and which files (with their content hash) hold that network
+    os.makedirs(os.path.dirname(snapshot_file) or '.', exist_ok=True)
+    snapshot = {
+        'roster': df.reset_index(drop=True),
+        'rules': compile_rules(rules).to_dict(),
+        'min_weight': min_weight,
+        'top_k': top_k,
+        'edges_file': edges_file,
+        'nodes_file': nodes_file,
+        'network_hash': network_hash(edges_file, nodes_file)
+    }
+    with open(snapshot_file, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def load_snapshot(snapshot_file=SNAPSHOT_FILE):
+    if not os.path.exists(snapshot_file):
+        return None
+    with open(snapshot_file, 'rb') as f:
+        return pickle.load(f)
+
+def _same(old, new):
+    # Element-wise equality where two missing values count as unchanged;
+    # categoricals are compared by value, whatever their categories
+    old = pd.Series(old).reset_index(drop=True)
+    new = pd.Series(new).reset_index(drop=True)
+    if isinstance(old.dtype, pd.CategoricalDtype) or isinstance(new.dtype, pd.CategoricalDtype):
+        old, new = old.astype(object), new.astype(object)
+    return ((old == new) | (old.isna() & new.isna())).to_numpy(dtype=bool)
+
+def diff_rosters(old_df, new_df, ruleset):
+    # Names added, removed, and changed in a way that affects edge weights
+    old_names = pd.Index(old_df['Name'])
+    new_names = pd.Index(new_df['Name'])
+    added = new_names.difference(old_names, sort=False)
+    removed = old_names.difference(new_names, sort=False)
+    common = new_names.intersection(old_names, sort=False)
+
+    old_common = old_df.set_index('Name').loc[common].reset_index()
+    new_common = new_df.set_index('Name').loc[common].reset_index()
+    unchanged = np.ones(len(common), dtype=bool)
+    reasons = {}
+    for rule in ruleset.rules:
+        same = _same(rule.row_features(old_common), rule.row_features(new_common))
+        for name in common[~same]:
+            reasons.setdefault(name, []).append(rule.column)
+        unchanged &= same
+    changed = common[~unchanged]
+    return list(added), list(removed), list(changed), reasons
+
+def _strength_by_name(edges_df):
+    return (edges_df.groupby('Source')['Weight'].sum()
+            .add(edges_df.groupby('Target')['Weight'].sum(), fill_value=0))
+
+def update_network(df, rules=None, min_weight=None, top_k=None, snapshot_file=SNAPSHOT_FILE):
+    # Patch the previous run's edges and node strengths for a changed roster.
+    # The files patched are the ones the snapshot was saved with, and only
+    # while their content is unchanged since then.
+    # Returns (edges_df, node_strength) or None when a full rebuild is needed.
+    snapshot = load_snapshot(snapshot_file)
+    if snapshot is None or 'network_hash' not in snapshot:
+        print("No previous snapshot found, running a full rebuild")
+        return None
+    edges_file, nodes_file = snapshot['edges_file'], snapshot['nodes_file']
+    if not (os.path.exists(edges_file) and os.path.exists(nodes_file)):
+        print(f"{edges_file} or {nodes_file} of the previous run is missing, running a full rebuild")
+        return None
+    if network_hash(edges_file, nodes_file) != snapshot['network_hash']:
+        print(f"{edges_file} changed since the previous run, running a full rebuild")
+        return None
+    ruleset = compile_rules(rules)
+    if (ruleset.to_dict()['rules'] != snapshot['rules']['rules']
+            or snapshot['min_weight'] != min_weight or snapshot['top_k'] or top_k):
+        # A top-k cutoff depends on every neighbour, so it cannot be patched locally either
+        print("Weighting or cutoffs changed since the previous run, running a full rebuild")
+        return None
+
+    df = df.reset_index(drop=True)
+    added, removed, changed, reasons = diff_rosters(snapshot['roster'], df, ruleset)
+
+    old_edges = read_edge_frame(edges_file) if is_edge_dir(edges_file) else pd.read_csv(edges_file)
+    old_nodes = pd.read_csv(nodes_file)
+
+    # Drop every edge touching a removed or changed cardinal
+    stale = set(removed) | set(changed)
+    stale_mask = old_edges['Source'].isin(stale) | old_edges['Target'].isin(stale)
+    dropped_edges = old_edges[stale_mask]
+    kept_edges = old_edges[~stale_mask]
+
+    # Recompute the edges of added and changed cardinals against the whole roster
+    position = pd.Series(np.arange(len(df)), index=df['Name'])
+    touched = np.sort(position[list(added) + list(changed)].to_numpy())
+    bound = ruleset.bind(EncodedRoster(df))
+    cols = np.arange(len(df))
+    weight = bound.pair_weights(touched, cols)
+    is_touched = np.zeros(len(df), dtype=bool)
+    is_touched[touched] = True
+    # Each pair once: touched-untouched pairs, and touched-touched pairs with i < j
+    pair_mask = (~is_touched[None, :]) | (cols[None, :] > touched[:, None])
+    pair_mask &= (cols[None, :] != touched[:, None]) & (weight > 0)
+    if min_weight is not None:
+        pair_mask &= weight >= min_weight
+    rows_idx, cols_idx = np.nonzero(pair_mask)
+    first = np.minimum(touched[rows_idx], cols[cols_idx])
+    second = np.maximum(touched[rows_idx], cols[cols_idx])
+    names = df['Name'].to_numpy()
+    new_edges = pd.DataFrame({
+        'Source': names[first],
+        'Target': names[second],
+        'Weight': weight[rows_idx, cols_idx]
+    })
+    if np.issubdtype(new_edges['Weight'].dtype, np.integer):
+        new_edges['Weight'] = new_edges['Weight'].astype(np.int64)
+
+    # Keep the combinations() order of a full rebuild: orient each edge by
+    # roster position and sort by (source, target) position
+    edges_df = pd.concat([kept_edges, new_edges], ignore_index=True)
+    source_pos = position[edges_df['Source']].to_numpy()
+    target_pos = position[edges_df['Target']].to_numpy()
+    swap = source_pos > target_pos
+    if swap.any():
+        edges_df.loc[swap, ['Source', 'Target']] = edges_df.loc[swap, ['Target', 'Source']].to_numpy()
+        source_pos, target_pos = np.minimum(source_pos, target_pos), np.maximum(source_pos, target_pos)
+    edges_df = edges_df.iloc[np.lexsort((target_pos, source_pos))].reset_index(drop=True)
+
+    # Patch node strengths: previous sums minus dropped edges plus new edges
+    strength = old_nodes.set_index('Id')['Weight'].reindex(df['Name']).fillna(0)
+    strength = strength.sub(_strength_by_name(dropped_edges), fill_value=0)
+    strength = strength.add(_strength_by_name(new_edges), fill_value=0)
+    strength = strength.reindex(df['Name']).fillna(0)
+    node_strength = pd.DataFrame({'Name': df['Name'], 'Weight': strength.to_numpy()})
+
+    print("Incremental update summary:")
+    print(f"  Added cardinals: {len(added)}")
+    for name in added:
+        print(f"    + {name}")
+    print(f"  Removed cardinals: {len(removed)}")
+    for name in removed:
+        print(f"    - {name}")
+    print(f"  Changed cardinals: {len(changed)}")
+    for name in changed:
+        print(f"    ~ {name} ({', '.join(reasons[name])})")
+    print(f"  Edges dropped: {len(dropped_edges)}, recomputed: {len(new_edges)}, "
+          f"total: {len(old_edges)} -> {len(edges_df)}")
+    return edges_df, node_strength
@@ -0,0 +1,128 @@
+# Lightweight run instrumentation: nested timed spans, counters and peak RSS,
+# written as a JSON trace, with an optional cProfile dump per top-level span.
+#
+# Spans and counters are always recorded (the cost is a perf_counter call);
+# output is written only when asked for, either with the --trace/--profile
+# flags of the scripts or through the environment:
+#   CONCLAVE_TRACE=trace.json   JSON trace written when the process exits
+#   CONCLAVE_PROFILE=profiles/  one <span>.prof per top-level span
+import atexit
+import cProfile
+import contextlib
+import functools
+import json
+import os
+import resource
+import sys
+import time
+
+class Tracer:
+    def __init__(self):
+        self.spans = []
+        self.counters = {}
+        self.stack = []
+        self.trace_file = None
+        self.profile_dir = None
+        self.start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def span(self, name, **attributes):
+        record = {
+            'name': name,
+            'parent': self.stack[-1]['name'] if self.stack else None,
+            'depth': len(self.stack),
+            'start': time.perf_counter() - self.start,
+            'attributes': attributes,
+            'counters': {},
+        }
+        self.stack.append(record)
+        profiler = None
+        if self.profile_dir and record['depth'] == 0:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler is already running (e.g. python -m cProfile)
+                profiler = None
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                os.makedirs(self.profile_dir, exist_ok=True)
+                record['profile'] = os.path.join(self.profile_dir, f"{name.replace('/', '_')}.prof")
+                profiler.dump_stats(record['profile'])
+            record['seconds'] = time.perf_counter() - self.start - record['start']
+            record['peak_rss_mb'] = peak_rss_mb()
+            self.stack.pop()
+            self.spans.append(record)
+
+    def count(self, name, value=1):
+        # Added to the run totals and to every open span
+        self.counters[name] = self.counters.get(name, 0) + value
+        for record in self.stack:
+            record['counters'][name] = record['counters'].get(name, 0) + value
+
+    def to_dict(self):
+        return {
+            'argv': sys.argv,
+            'seconds': time.perf_counter() - self.start,
+            'peak_rss_mb': peak_rss_mb(),
+            'counters': self.counters,
+            'spans': sorted(self.spans, key=lambda record: record['start']),
+        }
+
+    def write(self, path=None):
+        path = path or self.trace_file
+        if not path:
+            return None
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+        return path
+
+    def configure(self, trace_file=None, profile_dir=None):
+        # Write the trace on exit when trace_file is set; profile top-level spans
+        if trace_file and not self.trace_file:
+            atexit.register(self.write)
+        self.trace_file = trace_file or self.trace_file
+        self.profile_dir = profile_dir or self.profile_dir
+
+    def summary(self):
+        # One line per span, indented by nesting, in start order
+        lines = []
+        for record in sorted(self.spans, key=lambda record: record['start']):
+            counters = ', '.join(f'{k}={v}' for k, v in record['counters'].items())
+            lines.append(f"{'  ' * record['depth']}{record['name']}: {record['seconds']:.3f}s, "
+                         f"{record['peak_rss_mb']:.0f} MB" + (f" ({counters})" if counters else ''))
+        return '\n'.join(lines)
+
+def peak_rss_mb():
+    # Process high-water mark; ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == 'darwin' else peak / 1024
+
+tracer = Tracer()
+tracer.configure(os.environ.get('CONCLAVE_TRACE'), os.environ.get('CONCLAVE_PROFILE'))
+
+span = tracer.span
+count = tracer.count
+
+def traced(name=None):
+    # Decorator form of span
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name or func.__qualname__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def add_arguments(parser):
+    parser.add_argument('--trace', default=None, metavar='FILE',
+                        help='write a JSON trace of timed spans, counters and peak RSS to FILE')
+    parser.add_argument('--profile', default=None, metavar='DIR',
+                        help='write a cProfile dump of every top-level stage to DIR')
+
+def configure(args):
+    tracer.configure(trace_file=args.trace, profile_dir=args.profile)
@@ -0,0 +1,155 @@
+# Node layouts computed once per graph and parameter set, shared by every renderer
+import math
+import os
+import networkx as nx
+import numpy as np
+from graph_loader import CACHE_DIR, file_hash, graph_hash
+from community_stats import graph_arrays
+
+# Above this many nodes the "auto" method switches to the multilevel layout
+MULTILEVEL_THRESHOLD = 500
+
+# Layouts already served in this process, keyed like the files on disk
+_memory_cache = {}
+
+# Part of the key, so that changing a layout algorithm retires its cached layouts
+SOURCE_HASH = file_hash(__file__)[:8]
+
+def spring_layout(G, seed=42, k=1, iterations=50):
+    return nx.spring_layout(G, k=k, iterations=iterations, seed=seed)
+
+# Coarsening runs Louvain on each node's BACKBONE_K heaviest edges only;
+# refinement runs max(iterations // REFINE_FRACTION, 1) force iterations
+BACKBONE_K = 10
+REFINE_FRACTION = 5
+
+# Nodes per row block of the repulsion step, bounds its memory
+REPULSION_BLOCK = 1024
+
+def backbone_edges(n, sources, targets, weights, top_k=BACKBONE_K):
+    # Indices of the edges among the top_k heaviest of either endpoint
+    ends = np.concatenate([sources, targets])
+    order = np.lexsort((-np.concatenate([weights, weights]), ends))
+    starts = np.searchsorted(ends[order], np.arange(n))
+    rank = np.arange(len(order)) - starts[ends[order]]
+    return np.unique(order[rank < top_k] % len(sources))
+
+def quotient_graph(n_communities, membership, sources, targets, weights):
+    # Community graph with summed inter-community weights
+    coarse = nx.Graph()
+    coarse.add_nodes_from(range(n_communities))
+    a, b = membership[sources], membership[targets]
+    between = a != b
+    pairs = np.stack([np.minimum(a, b), np.maximum(a, b)], axis=1)[between]
+    if len(pairs):
+        unique_pairs, inverse = np.unique(pairs, axis=0, return_inverse=True)
+        summed = np.bincount(inverse.ravel(), weights=weights[between])
+        coarse.add_weighted_edges_from(zip(unique_pairs[:, 0].tolist(), unique_pairs[:, 1].tolist(), summed.tolist()))
+    return coarse
+
+def repulsion(xy, membership, groups, k):
+    # Fruchterman-Reingold repulsion k^2/d: exact between nodes of the same
+    # community, other communities act as one body at their centroid
+    x, y = xy[:, 0], xy[:, 1]
+    displacement = np.zeros_like(xy)
+    sizes = np.array([len(members) for members in groups], dtype=float)
+    cx = np.bincount(membership, weights=x, minlength=len(sizes)) / np.maximum(sizes, 1)
+    cy = np.bincount(membership, weights=y, minlength=len(sizes)) / np.maximum(sizes, 1)
+    for start in range(0, len(xy), REPULSION_BLOCK):
+        rows = slice(start, start + REPULSION_BLOCK)
+        dx = x[rows, None] - cx[None, :]
+        dy = y[rows, None] - cy[None, :]
+        strength = sizes * (k * k) / np.maximum(dx * dx + dy * dy, 1e-6)
+        strength[np.arange(len(dx)), membership[rows]] = 0
+        displacement[rows, 0] += (dx * strength).sum(axis=1)
+        displacement[rows, 1] += (dy * strength).sum(axis=1)
+    for members in groups:
+        mx, my = x[members], y[members]
+        for start in range(0, len(members), REPULSION_BLOCK):
+            rows = members[start:start + REPULSION_BLOCK]
+            dx = x[rows, None] - mx[None, :]
+            dy = y[rows, None] - my[None, :]
+            strength = (k * k) / np.maximum(dx * dx + dy * dy, 1e-6)
+            displacement[rows, 0] += (dx * strength).sum(axis=1)
+            displacement[rows, 1] += (dy * strength).sum(axis=1)
+    return displacement
+
+def refine_layout(xy, membership, sources, targets, weights, k, iterations, temperature):
+    # Fruchterman-Reingold on the full graph from the seeded positions:
+    # attraction w*d^2/k along every edge, approximate repulsion, each node
+    # moving by the (linearly cooling) temperature per iteration
+    n = len(xy)
+    order = np.argsort(membership, kind='stable')
+    groups = np.split(order, np.cumsum(np.bincount(membership))[:-1])
+    for t in np.linspace(temperature, 0, iterations + 1)[:-1]:
+        displacement = repulsion(xy, membership, groups, k)
+        delta = xy[sources] - xy[targets]
+        pull = delta * (weights * np.hypot(delta[:, 0], delta[:, 1]) / k)[:, None]
+        for axis in range(2):
+            displacement[:, axis] += (np.bincount(targets, weights=pull[:, axis], minlength=n)
+                                      - np.bincount(sources, weights=pull[:, axis], minlength=n))
+        length = np.maximum(np.hypot(displacement[:, 0], displacement[:, 1]), 1e-2)
+        xy = xy + displacement * (t / length)[:, None]
+    return xy
+
+def multilevel_layout(G, seed=42, k=1, iterations=50):
+    # Coarsen the graph into Louvain communities of its edge backbone, lay out
+    # the community quotient graph, place every node near its community's
+    # position and refine a few force iterations on the full graph.
+    # Per iteration: O(m + sum of s_i^2 + n*c) instead of O(n^2).
+    nodes, sources, targets, weights = graph_arrays(G)
+    n = len(nodes)
+    if n < 3:
+        return spring_layout(G, seed=seed, k=k, iterations=iterations)
+    keep = backbone_edges(n, sources, targets, weights)
+    backbone = nx.Graph()
+    backbone.add_nodes_from(range(n))
+    backbone.add_weighted_edges_from(zip(sources[keep].tolist(), targets[keep].tolist(), weights[keep].tolist()))
+    communities = nx.community.louvain_communities(backbone, weight='weight', seed=seed)
+    membership = np.empty(n, dtype=np.int64)
+    for comm_id, members in enumerate(communities):
+        membership[list(members)] = comm_id
+
+    coarse = quotient_graph(len(communities), membership, sources, targets, weights)
+    coarse_pos = nx.spring_layout(coarse, k=k, iterations=iterations, seed=seed)
+    coarse_xy = np.array([coarse_pos[comm_id] for comm_id in range(len(communities))])
+
+    # Seed: uniform in a disc around the community position, area ~ its size
+    rng = np.random.default_rng(seed)
+    sizes = np.bincount(membership)
+    radius = 0.5 * np.sqrt(sizes[membership] / n) * np.sqrt(rng.random(n))
+    angle = rng.uniform(0, 2 * math.pi, n)
+    xy = coarse_xy[membership] + radius[:, None] * np.stack([np.cos(angle), np.sin(angle)], axis=1)
+
+    # k is relative to nx's unit box, the seeded layout spans [-1, 1]
+    xy = refine_layout(xy, membership, sources, targets, weights, k=2 * k,
+                       iterations=max(iterations // REFINE_FRACTION, 1), temperature=0.1)
+    return nx.rescale_layout_dict(dict(zip(nodes, xy)), scale=1)
+
+LAYOUT_METHODS = {
+    'spring': spring_layout,
+    'multilevel': multilevel_layout,
+}
+
+def get_layout(G, method='auto', seed=42, k=1, iterations=50):
+    # Positions for G, computed at most once per (graph hash, method, params)
+    if method == 'auto':
+        method = 'multilevel' if G.number_of_nodes() > MULTILEVEL_THRESHOLD else 'spring'
+    if method not in LAYOUT_METHODS:
+        raise ValueError(f"Unknown layout method: {method}")
+
+    key = f'layout-{graph_hash(G)}-{method}-{seed}-{k}-{iterations}-{SOURCE_HASH}'
+    nodes = list(G.nodes())
+    if key in _memory_cache:
+        return dict(zip(nodes, _memory_cache[key]))
+
+    cache_file = os.path.join(CACHE_DIR, f'{key}.npz')
+    if os.path.exists(cache_file):
+        positions = np.load(cache_file)['positions']
+    else:
+        pos = LAYOUT_METHODS[method](G, seed=seed, k=k, iterations=iterations)
+        positions = np.array([pos[node] for node in nodes])
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        np.savez(cache_file, positions=positions)
+    _memory_cache[key] = positions
+    return dict(zip(nodes, positions))
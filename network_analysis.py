@@ -1,194 +1,293 @@
+import argparse
+from functools import cached_property
 import pandas as pd
 import networkx as nx
-import matplotlib.pyplot as plt
 import numpy as np
-from community import community_louvain
-import seaborn as sns
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-
-# Load the data
-nodes_df = pd.read_csv('nodes.csv')
-edges_df = pd.read_csv('edges.csv')
-
-# Create a NetworkX graph
-G = nx.Graph()
-
-# Add nodes with attributes
-for _, row in nodes_df.iterrows():
-    G.add_node(row['Id'], 
-               country=row['Country'],
-               continent=row['Continent'],
-               order=row['Order'],
-               age=row['Age'],
-               weight=row['Weight'])
-
-# Add edges with weights
-for _, row in edges_df.iterrows():
-    G.add_edge(row['Source'], row['Target'], weight=row['Weight'])
-
-print("=== HÁLÓZATI ELEMZÉS ===")
-print("\n1. ALAPVETŐ JELLEMZŐK:")
-print(f"Csomópontok száma: {G.number_of_nodes()}")
-print(f"Élek száma: {G.number_of_edges()}")
-print(f"Átlagos fokszám: {sum(dict(G.degree()).values()) / G.number_of_nodes():.2f}")
-print(f"Hálózat átmérője: {nx.diameter(G)}")
-print(f"Átlagos legrövidebb út: {nx.average_shortest_path_length(G):.2f}")
-print(f"Klaszterezettségi együttható: {nx.average_clustering(G):.2f}")
-
-print("\n2. LEGFONTOSABB KARDINÁLISOK:")
-# Fokszám alapján
-degree_centrality = nx.degree_centrality(G)
-top_degree = sorted(degree_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-print("\nLegmagasabb fokszámú kardinálisok:")
-for node, centrality in top_degree:
-    print(f"{node}: {centrality:.3f}")
-
-# Közelségi központiság alapján
-closeness_centrality = nx.closeness_centrality(G)
-top_closeness = sorted(closeness_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-print("\nLegközelebbi kardinálisok (legrövidebb átlagos út):")
-for node, centrality in top_closeness:
-    print(f"{node}: {centrality:.3f}")
-
-# Közvetítő központiság alapján
-betweenness_centrality = nx.betweenness_centrality(G)
-top_betweenness = sorted(betweenness_centrality.items(), key=lambda x: x[1], reverse=True)[:5]
-print("\nLegfontosabb közvetítő kardinálisok:")
-for node, centrality in top_betweenness:
-    print(f"{node}: {centrality:.3f}")
-
-print("\n3. KÖZÖSSÉGEK ELEMZÉSE:")
-# Louvain módszerrel közösségek keresése
-communities = community_louvain.best_partition(G)
-num_communities = len(set(communities.values()))
-print(f"Talált közösségek száma: {num_communities}")
-
-# Közösségek méretének elemzése
-community_sizes = pd.Series(communities.values()).value_counts()
-print("\nKözösségek méretei:")
-for comm_id, size in community_sizes.items():
-    print(f"Közösség {comm_id}: {size} tag")
-
-print("\n4. FÖLDRAJZI ELEMZÉS:")
-# Kontinensek szerinti csoportosítás
-continent_groups = {}
-for node in G.nodes():
-    continent = G.nodes[node]['continent']
-    if continent not in continent_groups:
-        continent_groups[continent] = []
-    continent_groups[continent].append(node)
-
-print("\nKontinensek szerinti eloszlás:")
-for continent, nodes in continent_groups.items():
-    print(f"{continent}: {len(nodes)} kardinális")
-
-# Kontinensek közötti kapcsolatok
-continent_edges = []
-for u, v in G.edges():
-    u_continent = G.nodes[u]['continent']
-    v_continent = G.nodes[v]['continent']
-    if u_continent != v_continent:
-        continent_edges.append((u_continent, v_continent))
-
-print("\nKontinensek közötti kapcsolatok száma:")
-continent_connections = pd.Series(continent_edges).value_counts()
-for (cont1, cont2), count in continent_connections.items():
-    print(f"{cont1} - {cont2}: {count} kapcsolat")
-
-print("\n5. ÉLETKOR ELEMZÉS:")
-# Életkor szerinti csoportosítás
-age_groups = {
-    '70 alatt': [],
-    '70-75': [],
-    '75-80': [],
-    '80 felett': []
-}
+from graph_loader import load_graph
+from graph_metrics import distance_metrics
+from clustering import clustering_metrics
+from centrality import sampled_betweenness
+from community_stats import community_stats
+from community_detection import detect_communities, partition_agreement
+from spectral_analysis import spectral_analysis
+from layout_cache import get_layout
+from instrumentation import add_arguments, configure, count, span
 
-for node in G.nodes():
-    age = G.nodes[node]['age']
-    if age < 70:
-        age_groups['70 alatt'].append(node)
-    elif age < 75:
-        age_groups['70-75'].append(node)
-    elif age < 80:
-        age_groups['75-80'].append(node)
-    else:
-        age_groups['80 felett'].append(node)
-
-print("\nÉletkor szerinti eloszlás:")
-for group, nodes in age_groups.items():
-    print(f"{group}: {len(nodes)} kardinális")
-
-# Életkor és központiság kapcsolata
-age_centrality = []
-for node in G.nodes():
-    age = G.nodes[node]['age']
-    centrality = degree_centrality[node]
-    age_centrality.append((age, centrality))
-
-age_centrality_df = pd.DataFrame(age_centrality, columns=['Age', 'Centrality'])
-print("\nÉletkor és központiság korrelációja:")
-print(f"Korrelációs együttható: {age_centrality_df['Age'].corr(age_centrality_df['Centrality']):.3f}")
-
-# Vizuálizációk
-plt.figure(figsize=(15, 10))
-
-# 1. Életkor eloszlás
-plt.subplot(2, 2, 1)
-sns.histplot(data=nodes_df, x='Age', bins=20)
-plt.title('Kardinálisok életkorának eloszlása')
-
-# 2. Kontinensek eloszlása
-plt.subplot(2, 2, 2)
-continent_counts = nodes_df['Continent'].value_counts()
-plt.pie(continent_counts, labels=continent_counts.index, autopct='%1.1f%%')
-plt.title('Kontinensek szerinti eloszlás')
-
-# 3. Életkor és központiság kapcsolata
-plt.subplot(2, 2, 3)
-sns.scatterplot(data=age_centrality_df, x='Age', y='Centrality')
-plt.title('Életkor és központiság kapcsolata')
-
-# 4. Fokszám eloszlás
-plt.subplot(2, 2, 4)
-degree_sequence = sorted([d for n, d in G.degree()], reverse=True)
-plt.hist(degree_sequence, bins=20)
-plt.title('Fokszám eloszlás')
-
-plt.tight_layout()
-plt.savefig('network_analysis.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-print("\nAz elemzés kész! A részletes vizualizációk a 'network_analysis.png' fájlban találhatók.")
-
-def analyze_network(edges_file='edges.csv', nodes_file='nodes.csv'):
-    # Adatok betöltése
-    edges_df = pd.read_csv(edges_file)
-    nodes_df = pd.read_csv(nodes_file)
-    
-    # Hálózat létrehozása
-    G = nx.Graph()
-    
-    # Csomópontok hozzáadása
-    for _, row in nodes_df.iterrows():
-        G.add_node(row['Id'], 
-                   weight=row['Weight'],
-                   country=row['Country'],
-                   continent=row['Continent'],
-                   order=row['Order'],
-                   age=row['Age'])
-    
-    # Élek hozzáadása
-    for _, row in edges_df.iterrows():
-        G.add_edge(row['Source'], row['Target'], weight=row['Weight'])
+# A plotting könyvtárakat (matplotlib, seaborn) és a Louvain-modult csak a
+# használó függvények importálják, így a modul importálása gyors marad.
+
+class NetworkAnalysis:
+    # Lusta számítás: minden metrika csak az első hozzáféréskor fut le
+    def __init__(self, nodes_file='nodes.csv', edges_file='edges.csv', weighted_distances=False,
+                 betweenness_samples=None, seed=42, workers=None, preview=False,
+                 force_render=False, eigensolver='arpack'):
+        self.nodes_file = nodes_file
+        self.edges_file = edges_file
+        self.weighted_distances = weighted_distances
+        self.betweenness_samples = betweenness_samples
+        self.seed = seed
+        self.workers = workers
+        self.force_render = force_render
+        self.preview = preview
+        self.eigensolver = eigensolver
+
+    @cached_property
+    def G(self):
+        with span('network_analysis.load_graph'):
+            G = load_graph(self.nodes_file, self.edges_file)
+            count('nodes', G.number_of_nodes())
+            count('edges', G.number_of_edges())
+        return G
+
+    @cached_property
+    def nodes_df(self):
+        return pd.read_csv(self.nodes_file)
+
+    @cached_property
+    def distances(self):
+        # Egyetlen legrövidebb-út számítás az átmérőhöz, átlagos úthosszhoz és közelséghez
+        return distance_metrics(self.G, weighted=self.weighted_distances)
+
+    @cached_property
+    def diameter(self):
+        return self.distances.diameter
+
+    @cached_property
+    def average_shortest_path_length(self):
+        return self.distances.average_shortest_path_length
+
+    @cached_property
+    def clustering(self):
+        # Háromszögek a ritka szomszédsági mátrixból (A·A∘A)
+        return clustering_metrics(self.G)
+
+    @cached_property
+    def average_clustering(self):
+        return self.clustering.average_clustering
+
+    @cached_property
+    def degree_centrality(self):
+        return nx.degree_centrality(self.G)
+
+    @cached_property
+    def closeness_centrality(self):
+        return self.distances.closeness_centrality
+
+    @cached_property
+    def betweenness(self):
+        # (értékek, standard hiba) – mintavételezés nélkül a hiba nulla
+        return sampled_betweenness(self.G, k=self.betweenness_samples, seed=self.seed,
+                                   weighted=self.weighted_distances, workers=self.workers)
+
+    @cached_property
+    def betweenness_centrality(self):
+        return self.betweenness[0]
+
+    @cached_property
+    def communities(self):
+        communities = detect_communities(self.G, seed=self.seed)[0]
+        count('communities', len(set(communities.values())))
+        return communities
+
+    @cached_property
+    def spectral(self):
+        # Sajátvektor-, PageRank- és Katz-központiság, spektrális beágyazás és
+        # klaszterezés egyetlen ritka súlyozott szomszédsági mátrixból
+        with span('network_analysis.spectral_matrix'):
+            return spectral_analysis(self.G, seed=self.seed, eigensolver=self.eigensolver)
+
+    @cached_property
+    def age_centrality_df(self):
+        # Életkor és központiság kapcsolata
+        age_centrality = []
+        for node in self.G.nodes():
+            age = self.G.nodes[node]['age']
+            centrality = self.degree_centrality[node]
+            age_centrality.append((age, centrality))
+        return pd.DataFrame(age_centrality, columns=['Age', 'Centrality'])
+
+def print_top(centrality, title):
+    top = sorted(centrality.items(), key=lambda x: x[1], reverse=True)[:5]
+    print(title)
+    for node, value in top:
+        print(f"{node}: {value:.3f}")
+
+def report_basic(analysis):
+    G = analysis.G
+    print("=== HÁLÓZATI ELEMZÉS ===")
+    print("\n1. ALAPVETŐ JELLEMZŐK:")
+    print(f"Csomópontok száma: {G.number_of_nodes()}")
+    print(f"Élek száma: {G.number_of_edges()}")
+    print(f"Átlagos fokszám: {sum(dict(G.degree()).values()) / G.number_of_nodes():.2f}")
+    print(f"Hálózat átmérője: {analysis.diameter}")
+    print(f"Átlagos legrövidebb út: {analysis.average_shortest_path_length:.2f}")
+    print(f"Klaszterezettségi együttható: {analysis.average_clustering:.2f}")
+
+def report_centrality(analysis):
+    print("\n2. LEGFONTOSABB KARDINÁLISOK:")
+    # Fokszám alapján
+    print_top(analysis.degree_centrality, "\nLegmagasabb fokszámú kardinálisok:")
+    # Közelségi központiság alapján
+    print_top(analysis.closeness_centrality, "\nLegközelebbi kardinálisok (legrövidebb átlagos út):")
+    # Közvetítő központiság alapján
+    print_top(analysis.betweenness_centrality, "\nLegfontosabb közvetítő kardinálisok:")
+    if analysis.betweenness_samples:
+        errors = analysis.betweenness[1]
+        print(f"(becslés {analysis.betweenness_samples} pivot alapján, "
+              f"átlagos standard hiba: {np.mean(list(errors.values())):.4f})")
+
+def report_communities(analysis):
+    print("\n3. KÖZÖSSÉGEK ELEMZÉSE:")
+    # Louvain módszerrel közösségek keresése
+    communities = analysis.communities
+    num_communities = len(set(communities.values()))
+    print(f"Talált közösségek száma: {num_communities}")
+
+    # Közösségek méretének elemzése
+    community_sizes = pd.Series(communities.values()).value_counts()
+    print("\nKözösségek méretei:")
+    for comm_id, size in community_sizes.items():
+        print(f"Közösség {comm_id}: {size} tag")
+
+def report_spectral(analysis):
+    spectral = analysis.spectral
+    print("\n3/B. SPEKTRÁLIS ELEMZÉS:")
+    print(f"Spektrálsugár: {spectral.spectral_radius:.2f}")
+    print_top(spectral.eigenvector_centrality, "\nLegmagasabb sajátvektor-központiságú kardinálisok:")
+    print_top(spectral.pagerank, "\nLegmagasabb PageRank:")
+    print_top(spectral.katz_centrality, "\nLegmagasabb Katz-központiság:")
+
+    # Spektrális klaszterezés: KMeans a standardizált beágyazáson, a klaszterszám
+    # a normalizált Laplace-mátrix sajátértékei közti legnagyobb résből
+    clusters = spectral.clusters
+    count('spectral_clusters', len(set(clusters.values())))
+    print(f"\nSpektrális klaszterek száma: {len(set(clusters.values()))} "
+          f"({spectral.eigensolver} sajátérték-megoldó)")
+    print("Laplace-sajátértékek: " + ", ".join(f"{value:.3f}" for value in spectral.laplacian_eigenvalues))
+    for cluster_id, size in pd.Series(clusters).value_counts().sort_index().items():
+        print(f"Klaszter {cluster_id}: {size} tag")
+    ari, nmi = partition_agreement([clusters, analysis.communities])
+    print(f"Egyezés a Louvain-közösségekkel: ARI {ari:.3f}, NMI {nmi:.3f}")
+
+def report_geography(analysis):
+    G = analysis.G
+    print("\n4. FÖLDRAJZI ELEMZÉS:")
+    # Kontinensek szerinti csoportosítás
+    continent_groups = {}
+    for node in G.nodes():
+        continent = G.nodes[node]['continent']
+        if continent not in continent_groups:
+            continent_groups[continent] = []
+        continent_groups[continent].append(node)
+
+    print("\nKontinensek szerinti eloszlás:")
+    for continent, nodes in continent_groups.items():
+        print(f"{continent}: {len(nodes)} kardinális")
+
+    # Kontinensek közötti kapcsolatok
+    continent_edges = []
+    for u, v in G.edges():
+        u_continent = G.nodes[u]['continent']
+        v_continent = G.nodes[v]['continent']
+        if u_continent != v_continent:
+            continent_edges.append((u_continent, v_continent))
+
+    print("\nKontinensek közötti kapcsolatok száma:")
+    continent_connections = pd.Series(continent_edges).value_counts()
+    for (cont1, cont2), n in continent_connections.items():
+        print(f"{cont1} - {cont2}: {n} kapcsolat")
+
+def report_age(analysis):
+    G = analysis.G
+    print("\n5. ÉLETKOR ELEMZÉS:")
+    # Életkor szerinti csoportosítás
+    age_groups = {
+        '70 alatt': [],
+        '70-75': [],
+        '75-80': [],
+        '80 felett': []
+    }
+
+    for node in G.nodes():
+        age = G.nodes[node]['age']
+        if age < 70:
+            age_groups['70 alatt'].append(node)
+        elif age < 75:
+            age_groups['70-75'].append(node)
+        elif age < 80:
+            age_groups['75-80'].append(node)
+        else:
+            age_groups['80 felett'].append(node)
+
+    print("\nÉletkor szerinti eloszlás:")
+    for group, nodes in age_groups.items():
+        print(f"{group}: {len(nodes)} kardinális")
+
+    age_centrality_df = analysis.age_centrality_df
+    print("\nÉletkor és központiság korrelációja:")
+    print(f"Korrelációs együttható: {age_centrality_df['Age'].corr(age_centrality_df['Centrality']):.3f}")
+
+def plot_overview_figure(nodes_df, age_centrality_df, degree_sequence, output, dpi=300):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # Vizuálizációk
+    plt.figure(figsize=(15, 10))
+
+    # 1. Életkor eloszlás
+    plt.subplot(2, 2, 1)
+    sns.histplot(data=nodes_df, x='Age', bins=20)
+    plt.title('Kardinálisok életkorának eloszlása')
+
+    # 2. Kontinensek eloszlása
+    plt.subplot(2, 2, 2)
+    continent_counts = nodes_df['Continent'].value_counts()
+    plt.pie(continent_counts, labels=continent_counts.index, autopct='%1.1f%%')
+    plt.title('Kontinensek szerinti eloszlás')
+
+    # 3. Életkor és központiság kapcsolata
+    plt.subplot(2, 2, 3)
+    sns.scatterplot(data=age_centrality_df, x='Age', y='Centrality')
+    plt.title('Életkor és központiság kapcsolata')
+
+    # 4. Fokszám eloszlás
+    plt.subplot(2, 2, 4)
+    plt.hist(degree_sequence, bins=20)
+    plt.title('Fokszám eloszlás')
+
+    plt.tight_layout()
+    plt.savefig(output, dpi=dpi, bbox_inches='tight')
+    plt.close()
+
+def plot_overview(analysis, output='network_analysis.png', preview=False):
+    from render_queue import RenderJob, render
+    from static_render import PREVIEW_DPI
+
+    degree_sequence = sorted([d for n, d in analysis.G.degree()], reverse=True)
+    render([
+        RenderJob(output, plot_overview_figure,
+                  nodes_df=analysis.nodes_df,
+                  age_centrality_df=analysis.age_centrality_df,
+                  degree_sequence=degree_sequence,
+                  dpi=PREVIEW_DPI if preview else 300)
+    ], workers=analysis.workers, force=analysis.force_render)
+
+    print(f"\nAz elemzés kész! A részletes vizualizációk a '{output}' fájlban találhatók.")
+
+def analyze_network(edges_file='edges.csv', nodes_file='nodes.csv', preview=False,
+                    workers=None, force=False, seed=42):
+    from render_queue import RenderJob, render
+    from static_render import draw_network, plot_community_sizes, plot_stat_panels, plot_correlation_heatmap
+
+    # Hálózat betöltése
+    G = load_graph(nodes_file, edges_file)
     
     print(f"Hálózat statisztikái:")
     print(f"Csomópontok száma: {G.number_of_nodes()}")
     print(f"Élek száma: {G.number_of_edges()}")
     
-    # Közösségi detektálás Louvain módszerrel
-    communities = community_louvain.best_partition(G)
+    # Közösségi detektálás Louvain módszerrel (rögzített seed, gyorsítótárazva)
+    communities = detect_communities(G, seed=seed)[0]
     
     # Közösségek számának kiírása
     n_communities = len(set(communities.values()))
@@ -197,107 +296,91 @@ def analyze_network(edges_file='edges.csv', nodes_file='nodes.csv'):
     # Közösségi attribútum hozzáadása a csomópontokhoz
     nx.set_node_attributes(G, communities, 'community')
     
-    # Közösségek méretének vizualizálása
-    community_sizes = pd.Series(communities.values()).value_counts()
-    plt.figure(figsize=(10, 6))
-    community_sizes.plot(kind='bar')
-    plt.title('Közösségek mérete')
-    plt.xlabel('Közösség ID')
-    plt.ylabel('Csomópontok száma')
-    plt.savefig('community_sizes.png')
-    plt.close()
-    
-    # Hálózat vizualizálása közösségekkel
-    plt.figure(figsize=(15, 15))
-    
-    # Pozíciók számítása
-    pos = nx.spring_layout(G, k=1, iterations=50)
-    
-    # Csomópontok rajzolása közösségek szerint színezve
-    node_colors = [communities[node] for node in G.nodes()]
-    node_sizes = [G.nodes[node]['weight']/10 for node in G.nodes()]
-    
-    nx.draw_networkx_nodes(G, pos, 
-                          node_color=node_colors,
-                          node_size=node_sizes,
-                          alpha=0.8)
-    
-    # Élek rajzolása
-    edge_weights = [G[u][v]['weight'] for u, v in G.edges()]
-    nx.draw_networkx_edges(G, pos, 
-                          width=edge_weights,
-                          alpha=0.2)
-    
-    # Címkék rajzolása
-    nx.draw_networkx_labels(G, pos, 
-                           font_size=8,
-                           font_family='sans-serif')
-    
-    plt.title('Bíborosok hálózata közösségekkel')
-    plt.axis('off')
-    plt.savefig('network_visualization.png')
-    plt.close()
-    
     # Közösségi statisztikák
-    community_stats = {}
-    
-    for community_id in set(communities.values()):
-        # Közösséghez tartozó csomópontok
-        community_nodes = [node for node, comm in communities.items() if comm == community_id]
-        
-        # Alhálózat létrehozása
-        subgraph = G.subgraph(community_nodes)
-        
-        # Statisztikák számítása
-        stats = {
-            'size': len(community_nodes),
-            'density': nx.density(subgraph),
-            'avg_degree': sum(dict(subgraph.degree()).values()) / len(community_nodes),
-            'avg_weight': np.mean([G.nodes[node]['weight'] for node in community_nodes]),
-            'countries': len(set(G.nodes[node]['country'] for node in community_nodes)),
-            'continents': len(set(G.nodes[node]['continent'] for node in community_nodes))
-        }
-        
-        community_stats[community_id] = stats
-    
-    # Statisztikák DataFrame-be konvertálása
-    stats_df = pd.DataFrame.from_dict(community_stats, orient='index')
-    stats_df.index.name = 'Community'
+    stats_df = community_stats(G, communities)[[
+        'size', 'density', 'avg_degree', 'avg_weight', 'countries', 'continents'
+    ]].sort_index()
     
     # Statisztikák mentése CSV-be
     stats_df.to_csv('community_stats.csv')
     
-    # Közösségek jellemzőinek vizualizálása
-    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
-    
-    # Sűrűség
-    sns.barplot(x=stats_df.index, y='density', data=stats_df, ax=axes[0,0])
-    axes[0,0].set_title('Közösségek sűrűsége')
-    
-    # Átlagos fokszám
-    sns.barplot(x=stats_df.index, y='avg_degree', data=stats_df, ax=axes[0,1])
-    axes[0,1].set_title('Átlagos fokszám')
-    
-    # Országok száma
-    sns.barplot(x=stats_df.index, y='countries', data=stats_df, ax=axes[1,0])
-    axes[1,0].set_title('Országok száma')
-    
-    # Kontinensek száma
-    sns.barplot(x=stats_df.index, y='continents', data=stats_df, ax=axes[1,1])
-    axes[1,1].set_title('Kontinensek száma')
-    
-    plt.tight_layout()
-    plt.savefig('community_characteristics.png')
-    plt.close()
-    
-    # Közösségek jellemzőinek korrelációja
-    plt.figure(figsize=(10, 8))
-    sns.heatmap(stats_df.corr(), annot=True, cmap='coolwarm', center=0)
-    plt.title('Közösségi jellemzők korrelációja')
-    plt.savefig('community_correlations.png')
-    plt.close()
+    # Ábrák: egymástól függetlenek, párhuzamosan rajzolhatók
+    community_sizes = pd.Series(communities.values()).value_counts()
+    pos = get_layout(G, seed=seed)
+    render([
+        # Közösségek méretének vizualizálása
+        RenderJob('community_sizes.png', plot_community_sizes, community_sizes=community_sizes),
+        # Hálózat vizualizálása közösségekkel: csomópontok közösségek szerint
+        # színezve, címkék csak a legerősebb csomópontokon
+        RenderJob('network_visualization.png', draw_network,
+                  G=G, pos=pos, node_color=[communities[node] for node in G.nodes()],
+                  title='Bíborosok hálózata közösségekkel', preview=preview),
+        # Közösségek jellemzőinek vizualizálása
+        RenderJob('community_characteristics.png', plot_stat_panels,
+                  stats_df=stats_df, panels=[
+                      ('density', 'Közösségek sűrűsége'),
+                      ('avg_degree', 'Átlagos fokszám'),
+                      ('countries', 'Országok száma'),
+                      ('continents', 'Kontinensek száma')
+                  ]),
+        # Közösségek jellemzőinek korrelációja
+        RenderJob('community_correlations.png', plot_correlation_heatmap, stats_df=stats_df),
+    ], workers=workers, force=force)
     
     return G, communities, stats_df
 
+# Futtatható szakaszok, a teljes elemzés sorrendjében
+STAGES = {
+    'basic': report_basic,
+    'centrality': report_centrality,
+    'communities': report_communities,
+    'spectral': report_spectral,
+    'geography': report_geography,
+    'age': report_age,
+    'plot': lambda analysis: plot_overview(analysis, preview=analysis.preview),
+    'detailed': lambda analysis: analyze_network(analysis.edges_file, analysis.nodes_file,
+                                                 preview=analysis.preview,
+                                                 workers=analysis.workers,
+                                                 force=analysis.force_render,
+                                                 seed=analysis.seed),
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='A bíborosi hálózat elemzése')
+    parser.add_argument('--stages', default=','.join(STAGES),
+                        help=f"vesszővel elválasztott szakaszok ({', '.join(STAGES)})")
+    parser.add_argument('--nodes', default='nodes.csv')
+    parser.add_argument('--edges', default='edges.csv')
+    parser.add_argument('--weighted-distances', action='store_true',
+                        help='súlyozott távolság (1/Weight) a legrövidebb utakhoz és a közvetítő központisághoz')
+    parser.add_argument('--betweenness-samples', type=int, default=None,
+                        help='közvetítő központiság becslése ennyi pivot csúcsból')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='párhuzamos folyamatok száma (alapértelmezés: CPU-k száma)')
+    parser.add_argument('--preview', action='store_true',
+                        help='gyors, alacsony felbontású ábrák')
+    parser.add_argument('--force-render', action='store_true',
+                        help='változatlan bemenetű ábrák újrarajzolása is')
+    parser.add_argument('--eigensolver', choices=['arpack', 'lobpcg'], default='arpack',
+                        help='sajátérték-megoldó a spektrális beágyazáshoz')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    configure(args)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f"ismeretlen szakasz: {', '.join(unknown)}")
+
+    analysis = NetworkAnalysis(args.nodes, args.edges, weighted_distances=args.weighted_distances,
+                               betweenness_samples=args.betweenness_samples, seed=args.seed,
+                               workers=args.workers, preview=args.preview,
+                               force_render=args.force_render, eigensolver=args.eigensolver)
+    for stage in stages:
+        with span(f'network_analysis.{stage}'):
+            STAGES[stage](analysis)
+    return analysis
+
 if __name__ == "__main__":
-    G, communities, stats_df = analyze_network() 
\ No newline at end of file
+    main()
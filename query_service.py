@@ -0,0 +1,439 @@
+# Local HTTP/JSON query service for the cardinals network. The network is
+# loaded once and its metrics and communities are kept in memory, so
+# questions such as "who is most central among the African cardinals?" or
+# "what is X's ego network?" are answered without rerunning a script.
+#
+#   GET /health                                   sizes, version, load time
+#   GET /top?metric=pagerank&k=10&continent=Africa top-k by a node metric
+#   GET /node?id=NAME                             attributes and metrics of a node
+#   GET /ego?id=NAME&radius=1&min_weight=0        ego network (nodes and edges)
+#   GET /path?source=A&target=B&weighted=1        shortest path (length 1/Weight when weighted)
+#   GET /community?id=NAME  or  ?community=2      community of a node, with its members
+#   GET /communities                              community sizes and modularity
+#   GET /filter?order=CB&min_age=70&max_age=79    nodes matching attribute filters
+#   GET /reload                                   check the files for changes now
+# Filters (country, continent, order, community, min_age, max_age) work on
+# /top and /filter; comma-separated values match any of them.
+#
+# The files are polled for changes. A change is diffed against the loaded
+# network (nodes added/removed/changed, edges added/removed/reweighted), the
+# diff is applied to a copy of the graph, and the new snapshot replaces the
+# old one once its metrics are ready; queries keep reading the old snapshot
+# meanwhile. Metrics are reused when only node attributes changed.
+import argparse
+import asyncio
+import json
+import os
+import time
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+import networkx as nx
+import numpy as np
+import pandas as pd
+from edge_store import is_edge_dir, read_edge_frame, store_files
+from graph_loader import NODE_ATTRIBUTES, graph_from_frames, resolve_edges_file
+from instrumentation import add_arguments, configure, count, span
+
+METRICS = ('degree', 'strength', 'clustering', 'eigenvector', 'pagerank', 'katz')
+FILTER_ATTRIBUTES = ('country', 'continent', 'order')
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def read_network(nodes_file='nodes.csv', edges_file='edges.csv'):
+    # (nodes_df, edges_df) from the CSVs or the columnar store
+    edges_file = resolve_edges_file(edges_file)
+    if is_edge_dir(edges_file):
+        return pd.read_csv(os.path.join(edges_file, 'nodes.csv')), read_edge_frame(edges_file)
+    return pd.read_csv(nodes_file), pd.read_csv(edges_file)
+
+def file_stamp(nodes_file='nodes.csv', edges_file='edges.csv'):
+    # (path, mtime, size) of every input file; a change means a reload
+    edges_file = resolve_edges_file(edges_file)
+    paths = store_files(edges_file) if is_edge_dir(edges_file) else [nodes_file, edges_file]
+    return tuple((path, os.stat(path).st_mtime_ns, os.stat(path).st_size) for path in paths)
+
+def edge_table(edges_df):
+    # Undirected edges as (u, v, weight) with u < v, indexed by (u, v)
+    source = edges_df['Source'].astype(str).to_numpy()
+    target = edges_df['Target'].astype(str).to_numpy()
+    swap = source > target
+    table = pd.DataFrame({
+        'u': np.where(swap, target, source),
+        'v': np.where(swap, source, target),
+        'weight': edges_df['Weight'].to_numpy(),
+    })
+    return table.drop_duplicates(['u', 'v'], keep='last').set_index(['u', 'v'])['weight']
+
+def node_table(nodes_df):
+    return nodes_df.assign(Id=nodes_df['Id'].astype(str)).set_index('Id')[list(NODE_ATTRIBUTES)]
+
+def diff_network(old_nodes, old_edges, new_nodes, new_edges):
+    # Node and edge changes between two (node_table, edge_table) pairs
+    common = old_nodes.index.intersection(new_nodes.index)
+    old_common, new_common = old_nodes.loc[common], new_nodes.loc[common]
+    same = (old_common == new_common) | (old_common.isna() & new_common.isna())
+    joined = pd.concat([old_edges.rename('old'), new_edges.rename('new')], axis=1)
+    return {
+        'added_nodes': new_nodes.index.difference(old_nodes.index),
+        'removed_nodes': old_nodes.index.difference(new_nodes.index),
+        'changed_nodes': common[~same.all(axis=1).to_numpy()],
+        'added_edges': joined.index[joined['old'].isna()],
+        'removed_edges': joined.index[joined['new'].isna()],
+        'reweighted_edges': joined.index[joined['old'].notna() & joined['new'].notna()
+                                         & (joined['old'] != joined['new'])],
+    }
+
+def apply_diff(G, diff, nodes, edges):
+    # Patched copy of G; the original keeps serving queries
+    G = G.copy()
+    G.remove_edges_from(diff['removed_edges'])
+    G.remove_nodes_from(diff['removed_nodes'])
+    attributes = nodes.rename(columns=NODE_ATTRIBUTES)
+    for node in diff['added_nodes'].append(diff['changed_nodes']):
+        G.add_node(node, **attributes.loc[node].to_dict())
+    updated = diff['added_edges'].append(diff['reweighted_edges'])
+    G.add_weighted_edges_from((u, v, edges[(u, v)]) for u, v in updated)
+    return G
+
+def node_metrics(G, seed=42):
+    # One row per node: attributes, community and every METRICS column
+    from clustering import clustering_metrics
+    from community_detection import detect_communities
+    from spectral_analysis import spectral_analysis
+    nodes = list(G.nodes())
+    frame = pd.DataFrame([G.nodes[node] for node in nodes], index=pd.Index(nodes, name='id'))
+    frame = frame.drop(columns=['weight'], errors='ignore')
+    frame['degree'] = [degree for _, degree in G.degree()]
+    frame['strength'] = [strength for _, strength in G.degree(weight='weight')]
+    frame['clustering'] = clustering_metrics(G).clustering_array
+    spectral = spectral_analysis(G, seed=seed)
+    frame['eigenvector'] = spectral.eigenvector_array
+    frame['pagerank'] = spectral.pagerank_array()
+    frame['katz'] = spectral.katz_array()
+    communities, modularity = detect_communities(G, seed=seed)
+    frame['community'] = [communities[node] for node in nodes]
+    return frame, modularity
+
+class NetworkSnapshot:
+    # Everything one version of the network answers queries from
+    def __init__(self, G, nodes, edges, seed=42, version=1, metrics=None):
+        self.G = G
+        self.nodes = nodes
+        self.edges = edges
+        self.version = version
+        self.loaded_at = time.time()
+        if metrics is None:
+            with span('query_service.metrics', nodes=G.number_of_nodes()):
+                metrics = node_metrics(G, seed)
+        self.metrics, self.modularity = metrics
+
+    @classmethod
+    def load(cls, nodes_file='nodes.csv', edges_file='edges.csv', seed=42):
+        nodes_df, edges_df = read_network(nodes_file, edges_file)
+        G = graph_from_frames(nodes_df.assign(Id=nodes_df['Id'].astype(str)),
+                              edges_df.assign(Source=edges_df['Source'].astype(str),
+                                              Target=edges_df['Target'].astype(str)))
+        return cls(G, node_table(nodes_df), edge_table(edges_df), seed=seed)
+
+    def require_node(self, node):
+        if node is None:
+            raise QueryError(HTTPStatus.BAD_REQUEST, "missing parameter: id")
+        if node not in self.G:
+            raise QueryError(HTTPStatus.NOT_FOUND, f"unknown node: {node}")
+        return node
+
+def records(frame):
+    # JSON-ready rows; NaN becomes null
+    frame = frame.reset_index()
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+def _param(params, name, default=None, convert=str):
+    if name not in params:
+        return default
+    try:
+        return convert(params[name])
+    except ValueError:
+        raise QueryError(HTTPStatus.BAD_REQUEST, f"invalid value for {name}: {params[name]!r}")
+
+def _flag(value):
+    return value.lower() in ('1', 'true', 'yes')
+
+def select(snapshot, params):
+    # Metric rows matching the attribute filters in params
+    frame = snapshot.metrics
+    mask = np.ones(len(frame), dtype=bool)
+    for name in FILTER_ATTRIBUTES:
+        if name in params:
+            values = [value.strip().lower() for value in params[name].split(',')]
+            mask &= frame[name].astype(str).str.lower().isin(values).to_numpy()
+    if 'community' in params:
+        try:
+            communities = [int(value) for value in params['community'].split(',')]
+        except ValueError:
+            raise QueryError(HTTPStatus.BAD_REQUEST, f"invalid value for community: {params['community']!r}")
+        mask &= frame['community'].isin(communities).to_numpy()
+    min_age = _param(params, 'min_age', convert=float)
+    max_age = _param(params, 'max_age', convert=float)
+    if min_age is not None:
+        mask &= (frame['age'] >= min_age).to_numpy()
+    if max_age is not None:
+        mask &= (frame['age'] <= max_age).to_numpy()
+    return frame[mask]
+
+def query_health(snapshot, params):
+    return {
+        'nodes': snapshot.G.number_of_nodes(),
+        'edges': snapshot.G.number_of_edges(),
+        'communities': int(snapshot.metrics['community'].nunique()),
+        'version': snapshot.version,
+        'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(snapshot.loaded_at)),
+        'metrics': list(METRICS),
+    }
+
+def query_top(snapshot, params):
+    metric = _param(params, 'metric', 'pagerank')
+    if metric not in METRICS:
+        raise QueryError(HTTPStatus.BAD_REQUEST, f"unknown metric: {metric} (one of {', '.join(METRICS)})")
+    k = _param(params, 'k', 10, int)
+    selected = select(snapshot, params)
+    top = selected.sort_values(metric, ascending=False, kind='stable').head(k)
+    return {'metric': metric, 'matched': len(selected), 'results': records(top)}
+
+def query_node(snapshot, params):
+    node = snapshot.require_node(params.get('id'))
+    return records(snapshot.metrics.loc[[node]])[0]
+
+def query_ego(snapshot, params):
+    node = snapshot.require_node(params.get('id'))
+    radius = _param(params, 'radius', 1, int)
+    min_weight = _param(params, 'min_weight', 0, float)
+    G = snapshot.G
+    if min_weight:
+        G = nx.subgraph_view(G, filter_edge=lambda u, v: snapshot.G[u][v]['weight'] >= min_weight)
+    ego = nx.ego_graph(G, node, radius=radius)
+    return {
+        'center': node,
+        'radius': radius,
+        'nodes': records(snapshot.metrics.loc[list(ego.nodes())]),
+        'edges': [{'source': u, 'target': v, 'weight': w} for u, v, w in ego.edges(data='weight')],
+    }
+
+def query_path(snapshot, params):
+    source = snapshot.require_node(params.get('source'))
+    target = snapshot.require_node(params.get('target'))
+    weighted = _flag(params.get('weighted', '0'))
+    length = (lambda u, v, data: 1.0 / data['weight']) if weighted else None
+    try:
+        path = nx.shortest_path(snapshot.G, source, target, weight=length)
+    except nx.NetworkXNoPath:
+        raise QueryError(HTTPStatus.NOT_FOUND, f"no path between {source} and {target}")
+    weights = [snapshot.G[u][v]['weight'] for u, v in zip(path, path[1:])]
+    return {
+        'path': path,
+        'hops': len(path) - 1,
+        'length': sum(1.0 / w for w in weights) if weighted else len(path) - 1,
+        'weights': weights,
+    }
+
+def query_community(snapshot, params):
+    if 'id' in params:
+        community = int(snapshot.metrics.at[snapshot.require_node(params['id']), 'community'])
+    else:
+        community = _param(params, 'community', convert=int)
+        if community is None:
+            raise QueryError(HTTPStatus.BAD_REQUEST, "missing parameter: id or community")
+    members = snapshot.metrics[snapshot.metrics['community'] == community]
+    if members.empty:
+        raise QueryError(HTTPStatus.NOT_FOUND, f"unknown community: {community}")
+    members = members.sort_values('pagerank', ascending=False, kind='stable')
+    return {'community': community, 'size': len(members), 'members': records(members)}
+
+def query_communities(snapshot, params):
+    metrics = snapshot.metrics.sort_values('pagerank', ascending=False, kind='stable')
+    grouped = metrics.groupby('community', sort=True)
+    return {
+        'modularity': snapshot.modularity,
+        'communities': [{
+            'community': int(community),
+            'size': len(members),
+            'average_age': float(members['age'].mean()),
+            'top': members.index[0],
+        } for community, members in grouped],
+    }
+
+def query_filter(snapshot, params):
+    selected = select(snapshot, params)
+    limit = _param(params, 'limit', None, int)
+    return {'matched': len(selected), 'results': records(selected.head(limit) if limit else selected)}
+
+ROUTES = {
+    '/health': query_health,
+    '/top': query_top,
+    '/node': query_node,
+    '/ego': query_ego,
+    '/path': query_path,
+    '/community': query_community,
+    '/communities': query_communities,
+    '/filter': query_filter,
+}
+
+class QueryService:
+    def __init__(self, nodes_file='nodes.csv', edges_file='edges.csv', seed=42, poll=2.0):
+        self.nodes_file = nodes_file
+        self.edges_file = edges_file
+        self.seed = seed
+        self.poll = poll
+        self.stamp = file_stamp(nodes_file, edges_file)
+        with span('query_service.load'):
+            self.snapshot = NetworkSnapshot.load(nodes_file, edges_file, seed=seed)
+        self._reload_lock = None
+
+    def reload(self, force=False):
+        # New snapshot from the changed files, or None when nothing changed
+        stamp = file_stamp(self.nodes_file, self.edges_file)
+        if stamp == self.stamp and not force:
+            return None
+        with span('query_service.reload'):
+            nodes_df, edges_df = read_network(self.nodes_file, self.edges_file)
+            nodes, edges = node_table(nodes_df), edge_table(edges_df)
+            current = self.snapshot
+            diff = diff_network(current.nodes, current.edges, nodes, edges)
+            G = apply_diff(current.G, diff, nodes, edges)
+            metrics = None
+            structural = ('added_nodes', 'removed_nodes', 'added_edges', 'removed_edges', 'reweighted_edges')
+            if not any(len(diff[name]) for name in structural):
+                # Only node attributes changed: the metrics still hold
+                metrics = current.metrics.copy()
+                for column, attribute in NODE_ATTRIBUTES.items():
+                    if attribute in metrics:
+                        metrics[attribute] = nodes[column].reindex(metrics.index)
+                metrics = (metrics, current.modularity)
+            snapshot = NetworkSnapshot(G, nodes, edges, seed=self.seed,
+                                       version=current.version + 1, metrics=metrics)
+        summary = {name: len(index) for name, index in diff.items()}
+        count('reloads')
+        return stamp, snapshot, summary
+
+    async def refresh(self, force=False):
+        self._reload_lock = self._reload_lock or asyncio.Lock()
+        async with self._reload_lock:
+            result = await asyncio.to_thread(self.reload, force)
+            if result is None:
+                return {'reloaded': False, 'version': self.snapshot.version}
+            self.stamp, self.snapshot, summary = result
+            print(f"Reloaded version {self.snapshot.version}: " +
+                  ", ".join(f"{name}={value}" for name, value in summary.items()))
+            return {'reloaded': True, 'version': self.snapshot.version, **summary}
+
+    async def watch(self):
+        while True:
+            await asyncio.sleep(self.poll)
+            try:
+                await self.refresh()
+            except (OSError, ValueError, KeyError, pd.errors.ParserError) as error:
+                # Files caught mid-write are picked up on the next poll
+                print(f"Reload failed: {error}")
+
+    async def dispatch(self, method, target):
+        if method not in ('GET', 'POST'):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {'error': f"unsupported method: {method}"}
+        url = urlsplit(target)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        start = time.perf_counter()
+        try:
+            if url.path == '/reload':
+                payload = await self.refresh(force=_flag(params.get('force', '0')))
+            elif url.path in ROUTES:
+                payload = ROUTES[url.path](self.snapshot, params)
+            else:
+                raise QueryError(HTTPStatus.NOT_FOUND, f"unknown endpoint: {url.path}")
+            status = HTTPStatus.OK
+        except QueryError as error:
+            status, payload = error.status, {'error': str(error)}
+        except Exception as error:
+            # A failing query must not take the connection or the service down
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(error).__name__}: {error}"}
+        count('queries')
+        if isinstance(payload, dict):
+            payload['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        return status, payload
+
+    async def handle_connection(self, reader, writer):
+        # Minimal HTTP/1.1: request line, headers, optional body; keep-alive
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if int(headers.get('content-length') or 0):
+                    await reader.readexactly(int(headers['content-length']))
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    status, payload = HTTPStatus.BAD_REQUEST, {'error': 'malformed request line'}
+                    parts = ['GET', '/', 'HTTP/1.0']
+                else:
+                    status, payload = await self.dispatch(parts[0], parts[1])
+                keep_alive = parts[2] == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                body = json.dumps(payload, ensure_ascii=False, default=_json_default).encode('utf-8')
+                head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                        "Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode('latin-1') + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+async def serve(service, host='127.0.0.1', port=8765):
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    G = service.snapshot.G
+    print(f"Serving {G.number_of_nodes()} nodes and {G.number_of_edges()} edges on http://{host}:{port}")
+    watcher = asyncio.create_task(service.watch()) if service.poll else None
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if watcher:
+            watcher.cancel()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP/JSON query service for the cardinals network")
+    parser.add_argument("--nodes", default="nodes.csv")
+    parser.add_argument("--edges", default="edges.csv", help="edges CSV or columnar store directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--poll", type=float, default=2.0,
+                        help="seconds between checks for changed files (0 disables reloading)")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    configure(args)
+    service = QueryService(args.nodes, args.edges, seed=args.seed, poll=args.poll)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
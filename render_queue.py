@@ -0,0 +1,87 @@
+# Headless figure rendering: independent figure jobs in a process pool,
+# skipped when their inputs are unchanged since the last run
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from code_hash import closure_hash, project_path
+from graph_loader import CACHE_DIR
+
+MANIFEST_FILE = os.path.join(CACHE_DIR, 'render_manifest.json')
+
+class RenderJob:
+    # func(output=output, **kwargs) must be a module-level function so it can
+    # be sent to a worker process
+    def __init__(self, output, func, **kwargs):
+        self.output = output
+        self.func = func
+        self.kwargs = kwargs
+
+    def inputs_hash(self):
+        # Covers the plotting code (the whole module defining func and the
+        # project modules it imports) as well as its data
+        digest = hashlib.sha256()
+        digest.update(f'{self.func.__module__}.{self.func.__qualname__}'.encode())
+        module = project_path(inspect.getsourcefile(self.func))
+        digest.update((closure_hash(module) if module else inspect.getsource(self.func)).encode())
+        digest.update(pickle.dumps(sorted(self.kwargs.items()), protocol=pickle.HIGHEST_PROTOCOL))
+        return digest.hexdigest()[:16]
+
+def use_agg_backend():
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+def run_job(func, output, kwargs):
+    use_agg_backend()
+    start = time.perf_counter()
+    func(output=output, **kwargs)
+    return time.perf_counter() - start
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    if not os.path.exists(manifest_file):
+        return {}
+    with open(manifest_file, encoding='utf-8') as f:
+        return json.load(f)
+
+def render(jobs, workers=None, force=False, manifest_file=MANIFEST_FILE, verbose=True):
+    # Run the jobs whose inputs changed; returns {output: seconds or None if skipped}
+    manifest = load_manifest(manifest_file)
+    timings = {}
+    pending = []
+    for job in jobs:
+        key = job.inputs_hash()
+        if not force and manifest.get(job.output) == key and os.path.exists(job.output):
+            timings[job.output] = None
+        else:
+            pending.append((job, key))
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    start = time.perf_counter()
+    if workers <= 1:
+        for job, key in pending:
+            timings[job.output] = run_job(job.func, job.output, job.kwargs)
+            manifest[job.output] = key
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=use_agg_backend) as pool:
+            futures = [(job, key, pool.submit(run_job, job.func, job.output, job.kwargs))
+                       for job, key in pending]
+            for job, key, future in futures:
+                timings[job.output] = future.result()
+                manifest[job.output] = key
+    elapsed = time.perf_counter() - start
+
+    os.makedirs(os.path.dirname(manifest_file) or '.', exist_ok=True)
+    with open(manifest_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    if verbose:
+        print(f"Ábrák ({len(pending)} rajzolva, {len(jobs) - len(pending)} változatlan, "
+              f"{max(workers, 1)} folyamat, {elapsed:.2f}s):")
+        for job in jobs:
+            seconds = timings[job.output]
+            status = 'változatlan, kihagyva' if seconds is None else f'{seconds:.2f}s'
+            print(f"- {job.output}: {status}")
+    return timings
@@ -0,0 +1,66 @@
+# Chunked roster ingestion: the CSV is read in fixed-size chunks, each chunk
+# is cleaned and continent-resolved with vectorized operations and stored
+# with compact dtypes, and the chunks are combined into one typed node table.
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from continent_resolver import default_resolver
+from instrumentation import count, span
+
+# Low-cardinality columns kept as pandas categoricals. Continent stays an
+# object column: unresolved countries are None there, and None == None is
+# part of the weighting semantics, which a categorical (NaN) cannot keep.
+CATEGORICAL_COLUMNS = ['Country', 'Order', 'Date_of_consistory', 'Pope_of_consistory']
+
+# Rows per chunk; peak memory while parsing is bounded by one chunk
+CHUNK_SIZE = 100_000
+
+# Footnote markers such as "Italy[a]"
+ANNOTATION_PATTERN = r"\[.*?\]"
+
+def clean_chunk(chunk, resolver):
+    # Strip annotations from country names and resolve each distinct country once
+    chunk['Country'] = chunk['Country'].str.replace(ANNOTATION_PATTERN, '', regex=True).str.strip()
+    countries = pd.Series(chunk['Country'].dropna().unique())
+    mapping = dict(zip(countries, resolver.resolve_many(countries)))
+    chunk['Continent'] = chunk['Country'].map(mapping).astype(object)
+    chunk['Continent'] = chunk['Continent'].where(chunk['Continent'].notna(), None)
+    return chunk
+
+def compact_chunk(chunk):
+    for column in CATEGORICAL_COLUMNS:
+        if column in chunk:
+            chunk[column] = chunk[column].astype('category')
+    if 'Age' in chunk:
+        age = pd.to_numeric(chunk['Age'], errors='coerce')
+        # int8 holds every plausible age; rows with a missing age keep a float column
+        if age.notna().all() and age.between(np.iinfo(np.int8).min, np.iinfo(np.int8).max).all():
+            age = age.astype(np.int8)
+        chunk['Age'] = age
+    return chunk
+
+def combine_chunks(chunks):
+    # Concatenate chunks whose categoricals have different categories
+    if len(chunks) == 1:
+        return chunks[0]
+    columns = list(chunks[0].columns)
+    categorical = [column for column in columns
+                   if all(isinstance(chunk[column].dtype, pd.CategoricalDtype) for chunk in chunks)]
+    df = pd.concat([chunk.drop(columns=categorical) for chunk in chunks], ignore_index=True)
+    for column in categorical:
+        df[column] = pd.Categorical(union_categoricals([chunk[column] for chunk in chunks]))
+    return df[columns]
+
+def read_roster(roster_file="data/cardinals.csv", resolver=None, chunksize=CHUNK_SIZE, usecols=None):
+    # Typed node table for roster_file; usecols drops columns the network does not need
+    resolver = resolver or default_resolver
+    chunks = []
+    with span("ingest.read_roster", chunksize=chunksize):
+        for chunk in pd.read_csv(roster_file, encoding="utf-8", chunksize=chunksize, usecols=usecols):
+            chunks.append(compact_chunk(clean_chunk(chunk, resolver)))
+            count("nodes", len(chunk))
+            count("chunks")
+        df = combine_chunks(chunks) if chunks else pd.read_csv(roster_file, encoding="utf-8", usecols=usecols)
+    resolver.save()
+    resolver.report()
+    return df
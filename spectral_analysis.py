@@ -0,0 +1,181 @@
+# Spectral centralities, embedding and clustering on the weighted sparse
+# adjacency matrix. The matrix is built once per graph; every measure is a
+# sparse eigenproblem, linear solve or matrix-vector iteration on it.
+#   eigenvector  leading eigenvector of A (ARPACK), unit length
+#   PageRank     power iteration on the weighted transition matrix, as nx.pagerank
+#   Katz         (I - alpha A) x = beta solved with conjugate gradients
+#   embedding    top eigenvectors of D^-1/2 A D^-1/2 (ARPACK or LOBPCG),
+#                i.e. the smallest of the normalized Laplacian, scaled by D^-1/2
+#   clusters     KMeans on the standardized embedding; k from the eigengap
+from functools import cached_property
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.linalg import cg, eigsh, lobpcg
+
+EIGENSOLVERS = ('arpack', 'lobpcg')
+
+def _sign_flip(vectors):
+    # Make the largest-magnitude entry of every column positive
+    rows = np.abs(vectors).argmax(axis=0)
+    return vectors * np.sign(vectors[rows, np.arange(vectors.shape[1])])
+
+class SpectralAnalysis:
+    def __init__(self, G, weight='weight', seed=42, dimensions=8, eigensolver='arpack'):
+        if eigensolver not in EIGENSOLVERS:
+            raise ValueError(f"Unknown eigensolver: {eigensolver}")
+        self.nodes = list(G.nodes())
+        self.seed = seed
+        self.dimensions = dimensions
+        self.eigensolver = eigensolver
+        adjacency = sp.csr_array(nx.to_scipy_sparse_array(G, nodelist=self.nodes, weight=weight,
+                                                          format='csr'), dtype=np.float64)
+        adjacency.setdiag(0)
+        adjacency.eliminate_zeros()
+        self.adjacency = adjacency
+
+    @property
+    def n(self):
+        return len(self.nodes)
+
+    @cached_property
+    def strength(self):
+        return np.asarray(self.adjacency.sum(axis=1)).ravel()
+
+    def _start_vector(self):
+        # Seeded, strictly positive: ARPACK otherwise draws its own random start
+        return np.random.default_rng(self.seed).uniform(0.5, 1.0, self.n)
+
+    def _largest_eigenpairs(self, matrix, k):
+        # k algebraically largest eigenpairs of a symmetric matrix, descending
+        k = min(k, self.n)
+        if self.eigensolver == 'lobpcg' and self.n >= 5 * k:
+            start = np.random.default_rng(self.seed).standard_normal((self.n, k))
+            values, vectors = lobpcg(matrix, start, largest=True, tol=1e-8, maxiter=500)
+        elif self.eigensolver == 'arpack' and k < self.n - 1:
+            values, vectors = eigsh(matrix, k=k, which='LA', v0=self._start_vector())
+        else:
+            # Too small for the iterative solvers
+            values, vectors = np.linalg.eigh(matrix.toarray())
+            values, vectors = values[-k:], vectors[:, -k:]
+        order = np.argsort(-values, kind='stable')
+        return values[order], vectors[:, order]
+
+    @cached_property
+    def leading_eigenpair(self):
+        if self.n == 0 or self.adjacency.nnz == 0:
+            return 0.0, np.zeros(self.n)
+        values, vectors = self._largest_eigenpairs(self.adjacency, 1)
+        return float(values[0]), np.abs(vectors[:, 0])
+
+    @property
+    def spectral_radius(self):
+        return self.leading_eigenpair[0]
+
+    @cached_property
+    def eigenvector_array(self):
+        vector = self.leading_eigenpair[1]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @cached_property
+    def eigenvector_centrality(self):
+        return dict(zip(self.nodes, self.eigenvector_array.tolist()))
+
+    def pagerank_array(self, alpha=0.85, tol=1e-10, max_iter=1000):
+        n = self.n
+        if n == 0:
+            return np.zeros(0)
+        inverse_strength = np.divide(1.0, self.strength, out=np.zeros(n), where=self.strength > 0)
+        transition = (sp.diags_array(inverse_strength) @ self.adjacency).T.tocsr()
+        dangling = self.strength == 0
+        x = np.full(n, 1.0 / n)
+        for _ in range(max_iter):
+            previous = x
+            x = alpha * (transition @ x + x[dangling].sum() / n) + (1 - alpha) / n
+            if np.abs(x - previous).sum() < n * tol:
+                break
+        return x / x.sum()
+
+    @cached_property
+    def pagerank(self):
+        return dict(zip(self.nodes, self.pagerank_array().tolist()))
+
+    def katz_array(self, alpha=None, beta=1.0):
+        # alpha must stay below 1 / spectral radius; by default 90% of that bound
+        if self.n == 0:
+            return np.zeros(0)
+        if alpha is None:
+            alpha = 0.9 / self.spectral_radius if self.spectral_radius else 0.1
+        system = sp.identity(self.n, format='csr') - alpha * self.adjacency
+        x, info = cg(system, np.full(self.n, float(beta)), rtol=1e-10, maxiter=10 * self.n)
+        if info != 0:
+            raise RuntimeError(f"Katz centrality did not converge (alpha={alpha})")
+        return x / np.linalg.norm(x)
+
+    @cached_property
+    def katz_centrality(self):
+        return dict(zip(self.nodes, self.katz_array().tolist()))
+
+    @cached_property
+    def _normalized_spectrum(self):
+        # Eigenpairs of D^-1/2 A D^-1/2, descending; the first is the trivial one
+        inverse_root = np.divide(1.0, np.sqrt(self.strength), out=np.zeros(self.n), where=self.strength > 0)
+        scaling = sp.diags_array(inverse_root)
+        normalized = (scaling @ self.adjacency @ scaling).tocsr()
+        values, vectors = self._largest_eigenpairs(normalized, self.dimensions + 1)
+        return values, _sign_flip(vectors) * inverse_root[:, None]
+
+    @property
+    def laplacian_eigenvalues(self):
+        # Smallest eigenvalues of the normalized Laplacian, ascending
+        return np.clip(1 - self._normalized_spectrum[0], 0, None)
+
+    @cached_property
+    def embedding(self):
+        return self._normalized_spectrum[1][:, 1:]
+
+    def eigengap_clusters(self, max_clusters=None):
+        # Cluster count before the largest gap among the smallest Laplacian eigenvalues
+        values = self.laplacian_eigenvalues[:(max_clusters or self.dimensions) + 1]
+        if len(values) < 3:
+            return max(len(values) - 1, 1)
+        return int(np.argmax(np.diff(values)[1:]) + 2)
+
+    def cluster_array(self, n_clusters=None):
+        from sklearn.cluster import KMeans
+        from sklearn.preprocessing import StandardScaler
+        n_clusters = n_clusters or self.eigengap_clusters()
+        if n_clusters < 2 or self.n <= n_clusters:
+            return np.zeros(self.n, dtype=np.int64)
+        features = StandardScaler().fit_transform(self.embedding[:, :max(n_clusters - 1, 1)])
+        labels = KMeans(n_clusters=n_clusters, n_init=10, random_state=self.seed).fit_predict(features)
+        # Cluster 0 is the largest
+        sizes = np.bincount(labels, minlength=n_clusters)
+        rank = np.empty(n_clusters, dtype=np.int64)
+        rank[np.argsort(-sizes, kind='stable')] = np.arange(n_clusters)
+        return rank[labels]
+
+    @cached_property
+    def cluster_labels(self):
+        return self.cluster_array()
+
+    @cached_property
+    def clusters(self):
+        return dict(zip(self.nodes, self.cluster_labels.tolist()))
+
+    def to_frame(self):
+        # One row per node: spectral centralities, cluster and embedding coordinates
+        frame = pd.DataFrame({
+            'Eigenvector': self.eigenvector_array,
+            'PageRank': self.pagerank_array(),
+            'Katz': self.katz_array(),
+            'SpectralCluster': self.cluster_labels,
+        }, index=pd.Index(self.nodes, name='Id'))
+        for dimension in range(min(2, self.embedding.shape[1])):
+            frame[f'Spectral{dimension + 1}'] = self.embedding[:, dimension]
+        return frame
+
+def spectral_analysis(G, weight='weight', seed=42, dimensions=8, eigensolver='arpack'):
+    return SpectralAnalysis(G, weight=weight, seed=seed, dimensions=dimensions, eigensolver=eigensolver)
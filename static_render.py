@@ -0,0 +1,179 @@
+# Bounded-cost static network rendering with matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgb
+from community_stats import graph_arrays
+
+# Resolution of preview renders
+PREVIEW_DPI = 72
+
+# Above RASTER_EDGES edges are accumulated into one image instead of being
+# stroked as lines, at RASTER_SCALE times the output resolution (figsize *
+# dpi); above MAX_DRAWN_EDGES only the heaviest ones are drawn at all. The
+# cardinals network (~8k edges) stays below RASTER_EDGES.
+RASTER_EDGES = 10000
+RASTER_SCALE = 0.5
+MAX_DRAWN_EDGES = 20000
+
+# Fraction of the axes the data spans after autoscaling (default 5% margins)
+DATA_FRACTION = 1 / 1.1
+
+def edge_segments(xy, sources, targets):
+    # (edges, 2, 2) segment array from node coordinates in node order
+    return np.stack([xy[sources], xy[targets]], axis=1)
+
+def decimate_edges(weights, max_edges=MAX_DRAWN_EDGES, seed=0):
+    # Indices of the max_edges heaviest edges, in edge order; ties at the
+    # cutoff weight are sampled uniformly (seeded) instead of by position
+    if max_edges is None or len(weights) <= max_edges:
+        return np.arange(len(weights))
+    tiebreak = np.random.default_rng(seed).random(len(weights))
+    return np.sort(np.lexsort((tiebreak, -weights))[:max_edges])
+
+def weight_bins(weights, bins=4):
+    # Quantile bin of every weight (0 = lightest) and the number of bins used
+    edges = np.unique(np.quantile(weights, np.linspace(0, 1, bins + 1)))
+    labels = np.clip(np.searchsorted(edges, weights, side='right') - 1, 0, len(edges) - 2) \
+        if len(edges) > 1 else np.zeros(len(weights), dtype=int)
+    return labels, labels.max() + 1
+
+def bin_alpha(alpha, b, n_bins):
+    # Alpha grows from alpha/2 for the lightest bin to alpha for the heaviest
+    return alpha * (0.5 + 0.5 * (b + 1) / n_bins)
+
+def draw_edges(ax, segments, weights, width_scale=1.0, alpha=0.2, color='gray', bins=4):
+    # One LineCollection per weight bin: heavier bins are drawn thicker, more
+    # opaque and on top. Every bin has a single linewidth (its mean weight),
+    # so the artist count is `bins` and Agg strokes each collection uniformly
+    if len(weights) == 0:
+        return
+    labels, n_bins = weight_bins(weights, bins)
+    for b in range(n_bins):
+        mask = labels == b
+        if not mask.any():
+            continue
+        collection = LineCollection(segments[mask], linewidths=weights[mask].mean() * width_scale,
+                                    colors=color, alpha=bin_alpha(alpha, b, n_bins), zorder=1 + b / n_bins)
+        collection.set_rasterized(True)
+        ax.add_collection(collection)
+
+def edge_coverage(segments, weights, extent, shape, chunk=4096):
+    # Per-pixel sum of the weights of the segments crossing it; every segment
+    # is sampled at about one point per pixel of its length
+    x0, x1, y0, y1 = extent
+    height, width = shape
+    scale = np.array([(width - 1) / ((x1 - x0) or 1), (height - 1) / ((y1 - y0) or 1)])
+    pixels = (segments - [x0, y0]) * scale
+    counts = np.ceil(np.abs(pixels[:, 1] - pixels[:, 0]).max(axis=1)).astype(np.int64) + 1
+    coverage = np.zeros(height * width)
+    for start in range(0, len(segments), chunk):
+        block = np.arange(start, min(start + chunk, len(segments)))
+        edge = np.repeat(block, counts[block])
+        offsets = np.cumsum(counts[block]) - counts[block]
+        step = np.arange(len(edge)) - np.repeat(offsets, counts[block])
+        t = (step / np.maximum(counts[edge] - 1, 1))[:, None]
+        points = np.rint(pixels[edge, 0] + t * (pixels[edge, 1] - pixels[edge, 0])).astype(np.int64)
+        coverage += np.bincount(points[:, 1] * width + points[:, 0], weights=weights[edge],
+                                minlength=coverage.size)
+    return coverage.reshape(shape)
+
+def draw_edge_raster(ax, segments, weights, extent, shape, alpha=0.2, color='gray', bins=4):
+    # Dense graphs: one image of shape (height, width) output pixels instead
+    # of line strokes, with the alpha of draw_edges' weight bins. A pixel
+    # crossed by edges of alphas a_i gets the opacity of those lines
+    # overlapping, 1 - prod(1 - a_i) = 1 - exp(-sum(-log(1 - a_i)))
+    if len(weights) == 0:
+        return
+    labels, n_bins = weight_bins(weights, bins)
+    depth = -np.log1p(-bin_alpha(alpha, labels, n_bins))
+    coverage = edge_coverage(segments, depth, extent, shape)
+    image = np.zeros(shape + (4,), dtype=np.float32)
+    image[..., :3] = to_rgb(color)
+    image[..., 3] = -np.expm1(-coverage)
+    ax.imshow(image, extent=extent, origin='lower', interpolation='nearest', aspect='auto', zorder=1)
+
+def draw_network(G, pos, output, node_color='lightblue', node_size_scale=0.1,
+                 edge_width_scale=1.0, edge_alpha=0.2, node_alpha=0.8,
+                 label_top_k=30, font_size=8, font_weight='normal', title=None,
+                 figsize=(15, 15), dpi=100, preview=False, bbox_inches=None, style=None,
+                 max_edges=MAX_DRAWN_EDGES):
+    # Nodes as one scatter, edges as binned LineCollections (the max_edges
+    # heaviest on dense graphs, None draws all), labels only for the
+    # label_top_k strongest nodes (None labels every node)
+    with plt.style.context(style or 'default'):
+        _draw_network(G, pos, output, node_color, node_size_scale, edge_width_scale,
+                      edge_alpha, node_alpha, label_top_k, font_size, font_weight, title,
+                      figsize, PREVIEW_DPI if preview else dpi, bbox_inches, max_edges)
+
+def _draw_network(G, pos, output, node_color, node_size_scale, edge_width_scale,
+                  edge_alpha, node_alpha, label_top_k, font_size, font_weight, title,
+                  figsize, dpi, bbox_inches, max_edges):
+    nodes, sources, targets, weights = graph_arrays(G)
+    strength = np.array([G.nodes[node].get('weight', 0) for node in nodes], dtype=float)
+    xy = np.array([pos[node] for node in nodes], dtype=float)
+
+    fig, ax = plt.subplots(figsize=figsize)
+    drawn = decimate_edges(weights, max_edges)
+    segments = edge_segments(xy, sources[drawn], targets[drawn])
+    if len(drawn) > RASTER_EDGES:
+        # Sized from the output pixels of the data area
+        extent = (xy[:, 0].min(), xy[:, 0].max(), xy[:, 1].min(), xy[:, 1].max())
+        box = ax.get_position()
+        shape = (max(int(box.height * figsize[1] * dpi * DATA_FRACTION * RASTER_SCALE), 2),
+                 max(int(box.width * figsize[0] * dpi * DATA_FRACTION * RASTER_SCALE), 2))
+        draw_edge_raster(ax, segments, weights[drawn], extent, shape, alpha=edge_alpha)
+    else:
+        draw_edges(ax, segments, weights[drawn], width_scale=edge_width_scale, alpha=edge_alpha)
+
+    if callable(node_color):
+        node_color = [node_color(node) for node in nodes]
+    ax.scatter(xy[:, 0], xy[:, 1], s=strength * node_size_scale, c=node_color,
+               alpha=node_alpha, zorder=2)
+
+    labelled = np.argsort(-strength, kind='stable')
+    if label_top_k is not None:
+        labelled = labelled[:label_top_k]
+    for i in labelled:
+        ax.text(xy[i, 0], xy[i, 1], str(nodes[i]), fontsize=font_size, fontweight=font_weight,
+                family='sans-serif', ha='center', va='center', zorder=3)
+
+    if title:
+        ax.set_title(title)
+    ax.set_axis_off()
+    ax.autoscale_view()
+    fig.savefig(output, dpi=dpi, bbox_inches=bbox_inches)
+    plt.close(fig)
+
+def plot_community_sizes(community_sizes, output, style=None):
+    # Bar chart of community sizes
+    with plt.style.context(style or 'default'):
+        plt.figure(figsize=(10, 6))
+        community_sizes.plot(kind='bar')
+        plt.title('Közösségek mérete')
+        plt.xlabel('Közösség ID')
+        plt.ylabel('Csomópontok száma')
+        plt.savefig(output)
+        plt.close()
+
+def plot_stat_panels(stats_df, panels, output, style=None):
+    # 2x2 grid of bar charts, one per (stats column, title) pair
+    import seaborn as sns
+    with plt.style.context(style or 'default'):
+        fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+        for ax, (column, title) in zip(axes.flat, panels):
+            sns.barplot(x=stats_df.index, y=column, data=stats_df, ax=ax)
+            ax.set_title(title)
+        plt.tight_layout()
+        plt.savefig(output)
+        plt.close()
+
+def plot_correlation_heatmap(stats_df, output, style=None):
+    # Correlation matrix of the community statistics
+    import seaborn as sns
+    with plt.style.context(style or 'default'):
+        plt.figure(figsize=(10, 8))
+        sns.heatmap(stats_df.corr(), annot=True, cmap='coolwarm', center=0)
+        plt.title('Közösségi jellemzők korrelációja')
+        plt.savefig(output)
+        plt.close()
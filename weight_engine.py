@@ -0,0 +1,403 @@
+# Vectorized pairwise edge-weight engine for the cardinals network
+import json
+import operator
+import time
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# Similarity rules used by generate_network. Each rule is compiled into
+# array operations; the weight of a pair is the sum of all rule contributions.
+DEFAULT_RULES = [
+    # +1 if appointed by same pope
+    {"type": "equality", "column": "Pope_of_consistory", "weight": 1},
+    # +1 if appointed on the same date
+    {"type": "equality", "column": "Date_of_consistory", "weight": 1},
+    # Age-based weighting: prioritize under 70
+    {"type": "predicate", "column": "Age", "op": "<", "value": 70, "both": 2, "either": 1},
+    # +1 if from the same country
+    {"type": "equality", "column": "Country", "weight": 1},
+    # +1 if from the same continent
+    {"type": "equality", "column": "Continent", "weight": 1},
+    # Order-based weighting: emphasize "CB"
+    {"type": "predicate", "column": "Order", "op": "==", "value": "CB", "both": 2, "either": 1},
+]
+
+PREDICATE_OPS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "in": lambda values, options: np.isin(values, list(options)),
+}
+
+KERNELS = {
+    "linear": lambda d, scale: np.clip(1 - d / scale, 0, None),
+    "gaussian": lambda d, scale: np.exp(-0.5 * (d / scale) ** 2),
+    "exponential": lambda d, scale: np.exp(-d / scale),
+    "threshold": lambda d, scale: (d <= scale).astype(np.float64),
+}
+
+def factorize(values):
+    # Integer codes with the same equality semantics as comparing the raw
+    # values with ==: None matches None, but NaN never matches anything.
+    if isinstance(getattr(values, "dtype", None), pd.CategoricalDtype):
+        # Categoricals are already coded; their missing values (-1) are NaN
+        codes = np.asarray(values.cat.codes, dtype=np.int64).copy()
+        missing = codes < 0
+        codes[missing] = -np.arange(1, missing.sum() + 1)
+        return codes
+    values = pd.Series(values, dtype=object).reset_index(drop=True)
+    codes, _ = pd.factorize(values, use_na_sentinel=False)
+    codes = codes.astype(np.int64)
+    nan_mask = values.map(lambda v: isinstance(v, float) and v != v).to_numpy(dtype=bool)
+    if nan_mask.any():
+        # Give every NaN its own negative code so it never equals another row
+        codes[nan_mask] = -np.arange(1, nan_mask.sum() + 1)
+    return codes
+
+class EncodedRoster:
+    # Column arrays of a roster, each factorized or converted at most once and
+    # shared by every rule set evaluated against it
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.n = len(self.df)
+        self._codes = {}
+        self._numeric = {}
+        self._predicates = {}
+
+    def codes(self, column):
+        if column not in self._codes:
+            self._codes[column] = factorize(self.df[column])
+        return self._codes[column]
+
+    def numeric(self, column):
+        if column not in self._numeric:
+            self._numeric[column] = pd.to_numeric(self.df[column], errors="coerce").to_numpy(dtype=np.float64)
+        return self._numeric[column]
+
+    def predicate(self, column, op, value):
+        key = (column, op, json.dumps(value, sort_keys=True, default=str))
+        if key not in self._predicates:
+            values = self.df[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # roster_ingest reads these columns as unordered categoricals,
+                # which only support == and !=
+                values = values.astype(object)
+            result = PREDICATE_OPS[op](values, value)
+            self._predicates[key] = np.asarray(pd.Series(result).fillna(False), dtype=bool)
+        return self._predicates[key]
+
+# Registry of rule types available to declarative specs
+RULE_TYPES = {}
+
+def register_rule_type(name):
+    def decorator(cls):
+        cls.type_name = name
+        RULE_TYPES[name] = cls
+        return cls
+    return decorator
+
+@register_rule_type("equality")
+class EqualityRule:
+    # +weight when both cardinals share the same value in `column`
+    def __init__(self, column, weight=1):
+        self.column = column
+        self.weight = weight
+        self.integral = float(weight).is_integer()
+
+    def bind(self, roster):
+        codes = roster.codes(self.column)
+        weight = self.weight
+        return lambda rows, cols: weight * (codes[rows][:, None] == codes[cols][None, :])
+
+    def row_features(self, df):
+        # Per-row values this rule reads; rows with equal features get equal weights
+        return df[self.column]
+
+    def to_dict(self):
+        return {"type": self.type_name, "column": self.column, "weight": self.weight}
+
+@register_rule_type("predicate")
+class PredicateRule:
+    # +both when the predicate holds for both cardinals, +either when it holds for one
+    def __init__(self, column, op, value, both=1, either=0):
+        if op not in PREDICATE_OPS:
+            raise ValueError(f"Unknown predicate operator: {op}")
+        self.column = column
+        self.op = op
+        self.value = value
+        self.both = both
+        self.either = either
+        self.integral = float(both).is_integer() and float(either).is_integer()
+
+    def bind(self, roster):
+        flags = roster.predicate(self.column, self.op, self.value)
+        both, either = self.both, self.either
+        if both == 2 * either:
+            # Additive case (e.g. 2/1): the contribution is either * (p_i + p_j)
+            return lambda rows, cols: either * (flags[rows][:, None].astype(np.int16) + flags[cols][None, :])
+        def evaluate(rows, cols):
+            row_flags = flags[rows][:, None]
+            col_flags = flags[cols][None, :]
+            return both * (row_flags & col_flags) + either * (row_flags ^ col_flags)
+        return evaluate
+
+    def row_features(self, df):
+        return pd.Series(EncodedRoster(df).predicate(self.column, self.op, self.value), index=df.index)
+
+    def to_dict(self):
+        return {"type": self.type_name, "column": self.column, "op": self.op,
+                "value": self.value, "both": self.both, "either": self.either}
+
+@register_rule_type("distance")
+class DistanceRule:
+    # +weight * kernel(|x_i - x_j|) for a numeric column; missing values contribute 0
+    def __init__(self, column, kernel="gaussian", scale=1.0, weight=1):
+        if kernel not in KERNELS:
+            raise ValueError(f"Unknown distance kernel: {kernel}")
+        self.column = column
+        self.kernel = kernel
+        self.scale = scale
+        self.weight = weight
+        self.integral = False
+
+    def bind(self, roster):
+        values = roster.numeric(self.column)
+        kernel = KERNELS[self.kernel]
+        weight, scale = self.weight, self.scale
+        def evaluate(rows, cols):
+            distance = np.abs(values[rows][:, None] - values[cols][None, :])
+            return weight * np.nan_to_num(kernel(distance, scale), nan=0.0)
+        return evaluate
+
+    def row_features(self, df):
+        return pd.to_numeric(df[self.column], errors="coerce")
+
+    def to_dict(self):
+        return {"type": self.type_name, "column": self.column, "kernel": self.kernel,
+                "scale": self.scale, "weight": self.weight}
+
+def make_rule(spec):
+    if not isinstance(spec, dict):
+        # Already a rule object
+        return spec
+    params = dict(spec)
+    rule_type = params.pop("type")
+    if rule_type not in RULE_TYPES:
+        raise ValueError(f"Unknown rule type: {rule_type}")
+    params.pop("name", None)
+    return RULE_TYPES[rule_type](**params)
+
+class RuleSet:
+    # A compiled weighting scheme: rule objects plus the dtype of their sum
+    def __init__(self, rules, name=None):
+        self.rules = [make_rule(rule) for rule in rules]
+        self.name = name
+        self.dtype = np.int32 if all(rule.integral for rule in self.rules) else np.float64
+
+    def bind(self, roster):
+        return BoundRuleSet(self, roster)
+
+    def to_dict(self):
+        return {"name": self.name, "rules": [rule.to_dict() for rule in self.rules]}
+
+class BoundRuleSet:
+    # A rule set bound to the arrays of one encoded roster
+    def __init__(self, ruleset, roster):
+        self.ruleset = ruleset
+        self.roster = roster
+        self.n = roster.n
+        self.evaluators = [rule.bind(roster) for rule in ruleset.rules]
+
+    def pair_weights(self, rows, cols):
+        # Weight matrix for the given row and column index arrays
+        weight = np.zeros((len(rows), len(cols)), dtype=self.ruleset.dtype)
+        for evaluate in self.evaluators:
+            weight += evaluate(rows, cols)
+        return weight
+
+def is_sweep(spec):
+    # A list of rule sets (RuleSets or {"rules": ...} dicts), not a list of rules
+    return (isinstance(spec, list) and bool(spec)
+            and (isinstance(spec[0], RuleSet) or (isinstance(spec[0], dict) and "rules" in spec[0])))
+
+def compile_rules(spec=None, name=None):
+    # Accepts a RuleSet, a list of rule dicts/objects, a {"name", "rules"} dict
+    # or a path to a JSON/YAML file holding either of the latter; sweeps
+    # (several rule sets) go through sweep_rules instead
+    if spec is None:
+        return RuleSet(DEFAULT_RULES, name=name or "default")
+    if isinstance(spec, RuleSet):
+        return spec
+    if isinstance(spec, str):
+        ruleset = load_rules(spec)
+        if isinstance(ruleset, list):
+            raise ValueError(f"{spec} is a sweep file with {len(ruleset)} rule sets; "
+                             "evaluate it with sweep_rules (conclave_generate.py --sweep)")
+        return ruleset
+    if is_sweep(spec):
+        raise ValueError(f"Got a sweep of {len(spec)} rule sets where one rule set was expected; "
+                         "evaluate it with sweep_rules (conclave_generate.py --sweep)")
+    if isinstance(spec, dict):
+        return RuleSet(spec["rules"], name=spec.get("name", name))
+    return RuleSet(spec, name=name)
+
+def load_rules(path):
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if isinstance(spec, list):
+        # A list of rule sets is a sweep file; a list of rules is a single set
+        if is_sweep(spec):
+            return [compile_rules(variant) for variant in spec]
+        return RuleSet(spec, name=path)
+    return compile_rules(spec, name=path)
+
+def iter_edge_blocks(bound, block_size=1024):
+    # Yield (sources, targets, weights) for every pair i < j with a positive
+    # weight, block by block, in the same order as combinations(range(n), 2)
+    n = bound.n
+    cols = np.arange(n)
+    for start in range(0, n, block_size):
+        rows = np.arange(start, min(start + block_size, n))
+        weight = bound.pair_weights(rows, cols)
+        mask = (cols[None, :] > rows[:, None]) & (weight > 0)
+        block_rows, block_cols = np.nonzero(mask)
+        yield rows[block_rows], block_cols, weight[block_rows, block_cols]
+
+def pairwise_edges(bound, block_size=1024):
+    sources, targets, weights = [], [], []
+    for block_sources, block_targets, block_weights in iter_edge_blocks(bound, block_size):
+        sources.append(block_sources)
+        targets.append(block_targets)
+        weights.append(block_weights)
+    if not sources:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0, dtype=bound.ruleset.dtype)
+    return np.concatenate(sources), np.concatenate(targets), np.concatenate(weights)
+
+def edges_frame(roster, sources, targets, weights):
+    names = roster.df["Name"].to_numpy()
+    if np.issubdtype(weights.dtype, np.integer):
+        weights = weights.astype(np.int64)
+    return pd.DataFrame({
+        "Source": names[sources],
+        "Target": names[targets],
+        "Weight": weights
+    })
+
+def build_edges(df, rules=None, block_size=1024, verbose=True):
+    # Encode the roster and compute all weighted edges, reporting timings
+    start = time.perf_counter()
+    roster = EncodedRoster(df)
+    bound = compile_rules(rules).bind(roster)
+    encoded = time.perf_counter()
+    sources, targets, weights = pairwise_edges(bound, block_size)
+    done = time.perf_counter()
+
+    n = roster.n
+    if verbose:
+        print(f"Encoded {n} cardinals in {encoded - start:.4f}s")
+        print(f"Evaluated {n * (n - 1) // 2} pairs in {done - encoded:.4f}s")
+
+    return edges_frame(roster, sources, targets, weights)
+
+def sweep_rules(df, variants, block_size=1024, verbose=True):
+    # Evaluate many weighting variants against one encoded roster; columns are
+    # factorized once and shared by every variant. variants is a list of rule
+    # set specs or the path of a sweep file. Returns {name: edges_df}.
+    if isinstance(variants, str):
+        variants = load_rules(variants)
+        variants = variants if isinstance(variants, list) else [variants]
+    roster = EncodedRoster(df)
+    results = {}
+    for index, variant in enumerate(variants):
+        ruleset = compile_rules(variant)
+        name = ruleset.name or f"variant_{index}"
+        start = time.perf_counter()
+        sources, targets, weights = pairwise_edges(ruleset.bind(roster), block_size)
+        results[name] = edges_frame(roster, sources, targets, weights)
+        if verbose:
+            print(f"{name}: {len(sources)} edges in {time.perf_counter() - start:.4f}s")
+    return results
+
+def _threshold_tiles(bound, min_weight, tile_size):
+    # Upper-triangle tiles only; each tile is tile_size x tile_size at most
+    n = bound.n
+    for row_start in range(0, n, tile_size):
+        rows = np.arange(row_start, min(row_start + tile_size, n))
+        for col_start in range(row_start, n, tile_size):
+            cols = np.arange(col_start, min(col_start + tile_size, n))
+            weight = bound.pair_weights(rows, cols)
+            mask = (weight > 0) & (weight >= min_weight)
+            if col_start == row_start:
+                mask &= cols[None, :] > rows[:, None]
+            tile_rows, tile_cols = np.nonzero(mask)
+            yield rows[tile_rows], cols[tile_cols], weight[tile_rows, tile_cols]
+
+def _top_k_tiles(bound, min_weight, top_k, tile_size):
+    # Keep the top_k strongest neighbours of every node (ties go to the lower
+    # index); a pair is kept if it is in the top_k of either endpoint
+    n = bound.n
+    for row_start in range(0, n, tile_size):
+        rows = np.arange(row_start, min(row_start + tile_size, n))
+        best_weight = np.full((len(rows), top_k), -np.inf)
+        best_col = np.full((len(rows), top_k), -1, dtype=np.int64)
+        for col_start in range(0, n, tile_size):
+            cols = np.arange(col_start, min(col_start + tile_size, n))
+            weight = bound.pair_weights(rows, cols).astype(np.float64)
+            weight[(weight <= 0) | (weight < min_weight) | (cols[None, :] == rows[:, None])] = -np.inf
+            candidate_weight = np.concatenate([best_weight, weight], axis=1)
+            candidate_col = np.concatenate([best_col, np.broadcast_to(cols, weight.shape)], axis=1)
+            order = np.argsort(-candidate_weight, axis=1, kind="stable")[:, :top_k]
+            best_weight = np.take_along_axis(candidate_weight, order, axis=1)
+            best_col = np.take_along_axis(candidate_col, order, axis=1)
+        keep = best_weight > -np.inf
+        tile_rows = np.broadcast_to(rows[:, None], keep.shape)[keep]
+        tile_cols = best_col[keep]
+        yield (np.minimum(tile_rows, tile_cols), np.maximum(tile_rows, tile_cols),
+               best_weight[keep].astype(bound.ruleset.dtype))
+
+def sparse_edges(bound, min_weight=1, top_k=None, tile_size=1024):
+    # Edge list as an upper-triangular scipy.sparse COO matrix, built tile by
+    # tile so peak memory is O(tile_size^2 + kept edges) rather than O(n^2)
+    rows, cols, weights = [], [], []
+    if top_k:
+        tiles = _top_k_tiles(bound, min_weight, top_k, tile_size)
+    else:
+        tiles = _threshold_tiles(bound, min_weight, tile_size)
+    for tile_rows, tile_cols, tile_weights in tiles:
+        rows.append(tile_rows.astype(np.int32))
+        cols.append(tile_cols.astype(np.int32))
+        weights.append(tile_weights)
+    rows = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+    cols = np.concatenate(cols) if cols else np.zeros(0, dtype=np.int32)
+    weights = np.concatenate(weights) if weights else np.zeros(0, dtype=bound.ruleset.dtype)
+
+    # Drop duplicates (top-k pairs chosen from both ends) and restore the
+    # combinations() ordering of the dense engine
+    order = np.lexsort((cols, rows))
+    rows, cols, weights = rows[order], cols[order], weights[order]
+    if top_k and len(rows):
+        unique = np.ones(len(rows), dtype=bool)
+        unique[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+        rows, cols, weights = rows[unique], cols[unique], weights[unique]
+    return sp.coo_matrix((weights, (rows, cols)), shape=(bound.n, bound.n))
+
+def build_sparse_edges(df, rules=None, min_weight=1, top_k=None, tile_size=1024, verbose=True):
+    # Sparse counterpart of build_edges; returns the COO matrix
+    start = time.perf_counter()
+    roster = EncodedRoster(df)
+    bound = compile_rules(rules).bind(roster)
+    matrix = sparse_edges(bound, min_weight=min_weight, top_k=top_k, tile_size=tile_size)
+    if verbose:
+        n = roster.n
+        print(f"Evaluated {n * (n - 1) // 2} pairs in {tile_size}x{tile_size} tiles "
+              f"in {time.perf_counter() - start:.4f}s, kept {matrix.nnz} edges")
+    return matrix